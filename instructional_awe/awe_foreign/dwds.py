@@ -0,0 +1,245 @@
+# dwds.py - Client for the word frequency API of DWDS.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# See: https://www.dwds.de/d/api
+#   GET https://www.dwds.de/api/frequency/?q=Haus
+#   {"hits": …, "q": "Haus", "total": …, "frequency": 6}
+#
+# Local lexica (awe_lexica/frequency_lexicon.py) should be preferred. If
+# the remote service has to be used, DWDS is a FrequencyLexicon, which
+#   - looks up every distinct word of a call only once,
+#   - keeps results in a FrequencyCache (in memory, optionally persisted
+#     in a SQLite database) for ttl seconds,
+#   - sends the remaining requests concurrently with asyncio, with at most
+#     max_concurrency open requests and rate_limit requests per second
+#     (over all calls and threads using the client),
+#   - retries failed requests (connection errors, timeouts, HTTP 429 and
+#     5xx) with exponential backoff.
+# So a batch of texts costs one request per distinct word not yet cached.
+# The requests use urllib in the default executor, no further dependency.
+# The base URL can be set, e.g. to a local stub server for testing.
+#
+# get_frequencies() runs its own event loop. Called from code with a
+# running event loop (Jupyter, async web apps), it runs the loop in a
+# helper thread; async code should await aget_frequencies() instead.
+
+import json
+import time
+import socket
+import sqlite3
+import asyncio
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from ..awe_lexica.frequency_lexicon import FrequencyLexicon
+
+# Configure Logging
+import logging, sys, os
+logging.basicConfig(stream=sys.stderr)
+LOGLEVEL = os.environ.get('LOGLEVEL', 'WARNING').upper()
+logging.basicConfig(level=LOGLEVEL)
+logger = logging.getLogger(__name__)
+
+
+class FrequencyCache(object):
+    """Cache for frequency entries with time to live, optionally
+    persisted in a SQLite database.
+    """
+
+    def __init__(self, path = None, ttl = 30 * 24 * 3600):
+        """Creates a new cache.
+
+        Keyword arguments:
+        path -- Path of a SQLite database to persist entries (default None).
+        ttl -- Time to live of entries in seconds (default 30 days).
+        """
+        self.path = path
+        self.ttl = ttl
+        self._entries = dict()
+        self._lock = threading.Lock()
+        if path:
+            connection = sqlite3.connect(path)
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS frequencies (word TEXT PRIMARY KEY, entry TEXT, expires REAL)")
+            connection.close()
+
+    def get_many(self, words):
+        """Returns dictionary: word -> entry for the given words,
+        which are cached and not expired.
+        """
+        now = time.time()
+        found = dict()
+        missing = list()
+        with self._lock:
+            for word in words:
+                cached = self._entries.get(word)
+                if cached is not None and cached[1] > now:
+                    found[word] = cached[0]
+                else:
+                    missing.append(word)
+        if self.path and missing:
+            connection = sqlite3.connect(self.path)
+            for start in range(0, len(missing), 500):
+                batch = missing[start:start + 500]
+                query = "SELECT word, entry, expires FROM frequencies WHERE word IN (%s) AND expires > ?" % ",".join("?" * len(batch))
+                for word, entry, expires in connection.execute(query, batch + [now]):
+                    found[word] = json.loads(entry)
+                    with self._lock:
+                        self._entries[word] = (found[word], expires)
+            connection.close()
+        return found
+
+    def put_many(self, entries):
+        """Stores the given dictionary: word -> entry."""
+        expires = time.time() + self.ttl
+        with self._lock:
+            for word, entry in entries.items():
+                self._entries[word] = (entry, expires)
+        if self.path and entries:
+            connection = sqlite3.connect(self.path)
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO frequencies VALUES (?, ?, ?)",
+                    [(word, json.dumps(entry), expires) for word, entry in entries.items()])
+            connection.close()
+
+    def clear(self):
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            connection = sqlite3.connect(self.path)
+            with connection:
+                connection.execute("DELETE FROM frequencies")
+            connection.close()
+
+
+class DWDS(FrequencyLexicon):
+    """Word frequencies from the DWDS API.
+    """
+
+    def __init__(self, base_url = "https://www.dwds.de/api/frequency/", cache = None,
+                 max_concurrency = 8, rate_limit = 5.0, retries = 3, backoff = 0.5, timeout = 10):
+        """Creates a new client.
+
+        Keyword arguments:
+        base_url -- URL of the frequency API (default DWDS).
+        cache -- FrequencyCache for the results (default: new in-memory cache).
+        max_concurrency -- Maximum number of open requests (default 8).
+        rate_limit -- Maximum number of requests per second (default 5, None for no limit).
+        retries -- Number of retries of a failed request (default 3).
+        backoff -- Delay before the first retry in seconds, doubled for
+            every further retry (default 0.5).
+        timeout -- Timeout of a request in seconds (default 10).
+        """
+        self.base_url = base_url
+        self.cache = cache if cache is not None else FrequencyCache()
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        # Shared by all calls, so the rate limit holds across batches.
+        self._throttle = _Throttle(rate_limit)
+        # For monitoring: number of words requested (one per distinct
+        # word not cached) and number of HTTP requests including retries.
+        self.requests = 0
+        self.attempts = 0
+
+    def get_frequencies(self, words):
+        """Returns dictionary: word -> entry {'hits', 'total', 'frequency'}
+        for the given words. Only words not in the cache are requested,
+        every distinct word once. Use aget_frequencies() in async code.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aget_frequencies(words))
+        # A loop is running in this thread: run a private
+        # loop in a helper thread and wait for it.
+        with ThreadPoolExecutor(max_workers = 1) as executor:
+            return executor.submit(asyncio.run, self.aget_frequencies(words)).result()
+
+    async def aget_frequencies(self, words):
+        """Coroutine version of get_frequencies()."""
+        words = list(dict.fromkeys(words))
+        entries = self.cache.get_many(words)
+        missing = [word for word in words if word not in entries]
+        if missing:
+            logger.debug("Requesting %d words from DWDS" % len(missing))
+            fetched = await self._fetch_many(missing)
+            self.cache.put_many(fetched)
+            entries.update(fetched)
+        return entries
+
+    async def _fetch_many(self, words):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(word):
+            async with semaphore:
+                self.requests += 1
+                return word, await self._fetch(word)
+
+        results = await asyncio.gather(*[fetch(word) for word in words])
+        return dict(results)
+
+    async def _fetch(self, word):
+        loop = asyncio.get_running_loop()
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            await self._throttle.wait()
+            try:
+                self.attempts += 1
+                return await loop.run_in_executor(None, self._request, word)
+            except urllib.error.HTTPError as error:
+                if (error.code != 429 and error.code < 500) or attempt == self.retries:
+                    raise
+            except (urllib.error.URLError, TimeoutError, socket.timeout):
+                if attempt == self.retries:
+                    raise
+            logger.debug("Request for '%s' failed, retrying in %.1f s" % (word, delay))
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    def _request(self, word):
+        url = self.base_url + "?" + urllib.parse.urlencode({"q": word})
+        with urllib.request.urlopen(url, timeout = self.timeout) as response:
+            result = json.loads(response.read().decode("utf-8"))
+        return {'hits': int(result['hits']), 'total': int(result['total']),
+                'frequency': float(result['frequency'])}
+
+
+class _Throttle(object):
+    # Spaces the starts of requests by 1 / rate seconds. Start times are
+    # reserved under a thread lock, so one throttle works for several
+    # threads and event loops.
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_start = 0.0
+        self.lock = threading.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
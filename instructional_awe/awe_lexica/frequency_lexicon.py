@@ -0,0 +1,184 @@
+# frequency_lexicon.py - Word frequencies from local lexica.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# Coh-Metrix looks up word frequencies in CELEX. For german texts we use
+# the frequencies of DWDS (or another corpus, e.g. SUBTLEX-DE). Asking the
+# DWDS API for every token is far too slow for scoring, so frequencies are
+# looked up in a local lexicon built once from an offline dump.
+#
+# A FrequencyLexicon returns entries in the format of the DWDS API:
+#   {'hits': absolute frequency, 'total': size of the corpus,
+#    'frequency': frequency class (logarithmic scale)}
+# Unknown words have 0 hits and frequency class 0.
+#
+# SQLiteFrequencyLexicon stores the dump in a SQLite table with the words
+# as primary key (B-tree, O(log n) lookups); get_frequencies() looks up
+# many words with a few queries. Build it from a tab separated dump
+# (word, hits, frequency class per line):
+#   SQLiteFrequencyLexicon.build_from_tsv("dwds.db", "dwds.tsv", total = …)
+#
+# The default lexicon can be configured with the environment variable
+#   AWE_FREQUENCY_LEXICON  -- path of a SQLite frequency lexicon
+
+import os
+import codecs
+import sqlite3
+import pathlib
+import threading
+
+
+class FrequencyLexicon(object):
+    """Interface of frequency lexica.
+    """
+
+    def get_frequency(self, word):
+        """Returns the entry {'hits', 'total', 'frequency'} of a word."""
+        return self.get_frequencies([word])[word]
+
+    def get_frequencies(self, words):
+        """Returns dictionary: word -> entry {'hits', 'total', 'frequency'}
+        for the given words. Has to be implemented by specific lexicon class.
+        """
+        raise NotImplementedError()
+
+
+class SQLiteFrequencyLexicon(FrequencyLexicon):
+    """Frequency lexicon stored in a SQLite database.
+    """
+
+    # Maximum number of words per query (SQLite limits host parameters).
+    batch_size = 500
+
+    def __init__(self, path, lowercase_fallback = True):
+        """Opens the lexicon at the given path.
+
+        Keyword arguments:
+        lowercase_fallback -- Look up the lower case word, if the word
+            itself is not in the lexicon (default True).
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError("No frequency lexicon at '%s'." % path)
+        self.path = path
+        self.lowercase_fallback = lowercase_fallback
+        self._local = threading.local()
+        self.total = int(self._read_meta("total"))
+
+    @classmethod
+    def build(cls, path, entries, total = None):
+        """Creates a lexicon at the given path from an iterable of
+        tuples (word, hits, frequency class). Returns the lexicon.
+
+        Keyword arguments:
+        total -- Size of the corpus (default: sum of hits).
+        """
+        connection = sqlite3.connect(path)
+        with connection:
+            connection.execute("DROP TABLE IF EXISTS frequencies")
+            connection.execute("DROP TABLE IF EXISTS meta")
+            connection.execute(
+                "CREATE TABLE frequencies (word TEXT PRIMARY KEY, hits INTEGER, frequency REAL) WITHOUT ROWID")
+            connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            hits_sum = 0
+            rows = list()
+            for word, hits, frequency in entries:
+                hits_sum += int(hits)
+                rows.append((word, int(hits), float(frequency)))
+                if len(rows) >= 10000:
+                    connection.executemany("INSERT OR REPLACE INTO frequencies VALUES (?, ?, ?)", rows)
+                    rows = list()
+            connection.executemany("INSERT OR REPLACE INTO frequencies VALUES (?, ?, ?)", rows)
+            connection.execute("INSERT INTO meta VALUES ('total', ?)",
+                               (str(hits_sum if total is None else total),))
+        connection.close()
+        return cls(path)
+
+    @classmethod
+    def build_from_tsv(cls, path, tsv_path, total = None, encoding = 'utf-8'):
+        """Creates a lexicon at the given path from a tab separated file
+        with the columns word, hits and frequency class. Returns the lexicon.
+        """
+        def entries():
+            with codecs.open(tsv_path, mode = 'r', encoding = encoding) as tsv_file:
+                for line in tsv_file:
+                    fields = line.rstrip("\n").split("\t")
+                    if len(fields) >= 3 and fields[1].isdigit():
+                        yield fields[0], fields[1], fields[2]
+        return cls.build(path, entries(), total)
+
+    def _connection(self):
+        # One read-only connection per thread.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            uri = pathlib.Path(self.path).resolve().as_uri() + "?mode=ro"
+            connection = sqlite3.connect(uri, uri = True)
+            self._local.connection = connection
+        return connection
+
+    def _read_meta(self, key):
+        try:
+            row = self._connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.DatabaseError:
+            # No meta table, or no SQLite database at all.
+            raise ValueError("'%s' is not a frequency lexicon (no meta table)." % self.path)
+        if row is None:
+            raise ValueError("Frequency lexicon '%s' has no entry '%s' in its meta table." % (self.path, key))
+        return row[0]
+
+    def _lookup(self, words):
+        found = dict()
+        words = list(words)
+        for start in range(0, len(words), self.batch_size):
+            batch = words[start:start + self.batch_size]
+            query = "SELECT word, hits, frequency FROM frequencies WHERE word IN (%s)" % ",".join("?" * len(batch))
+            for word, hits, frequency in self._connection().execute(query, batch):
+                found[word] = {'hits': hits, 'total': self.total, 'frequency': frequency}
+        return found
+
+    def get_frequencies(self, words):
+        """Returns dictionary: word -> entry {'hits', 'total', 'frequency'}
+        for the given words. Every distinct word is looked up once.
+        """
+        words = set(words)
+        found = self._lookup(words)
+        if self.lowercase_fallback:
+            missing = {word.lower() for word in words if word not in found} - set(found)
+            found.update(self._lookup(missing))
+        entries = dict()
+        for word in words:
+            entry = found.get(word)
+            if entry is None and self.lowercase_fallback:
+                entry = found.get(word.lower())
+            if entry is None:
+                entry = {'hits': 0, 'total': self.total, 'frequency': 0}
+            entries[word] = entry
+        return entries
+
+
+# Process-wide default lexicon.
+_default_lexicon = None
+
+def get_frequency_lexicon():
+    """Returns the process-wide default lexicon."""
+    global _default_lexicon
+    if _default_lexicon is None:
+        path = os.environ.get("AWE_FREQUENCY_LEXICON")
+        if not path:
+            raise ValueError("No frequency lexicon configured (set AWE_FREQUENCY_LEXICON).")
+        _default_lexicon = SQLiteFrequencyLexicon(path)
+    return _default_lexicon
+
+def set_frequency_lexicon(lexicon):
+    """Replaces the process-wide default lexicon."""
+    global _default_lexicon
+    _default_lexicon = lexicon
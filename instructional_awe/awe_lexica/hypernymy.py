@@ -0,0 +1,246 @@
+# hypernymy.py - Offline hypernym graph with precomputed depths.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# Coh-Metrix measures hypernymy of nouns and verbs as the number of levels
+# above a word in WordNet. For german words the hypernym relations are
+# extracted once from a local dump (GermaNet or Wiktionary) into a
+# tab separated file with one relation per line:
+#   lemma <TAB> hypernym <TAB> part of speech ("noun" or "verb")
+# and stored as a HypernymIndex, a directory with
+#   meta.json            -- format and version
+#   lemmas.npy           -- lemmas of all nodes (UTF-8 bytes), sorted by
+#                           part of speech and lemma
+#   parts.npy            -- part of speech of every node (0 noun, 1 verb)
+#   parent_offsets.npy   -- hypernyms of every node as compressed rows
+#   parents.npy             (parents[parent_offsets[i]:parent_offsets[i + 1]])
+#   depths.npy           -- float32 matrix, minimum and mean depth per node
+#
+# The depth of a node without hypernyms (root) is 0. The minimum depth is
+# the length of the shortest path to a root, the mean depth is 1 + the mean
+# depth of the hypernyms, i.e. every hypernym (sense) weighs the same.
+# Dumps contain cycles; the relations closing a cycle are dropped while
+# building, so the stored graph is a DAG.
+#
+# Depths are computed while building; the lemmas of a text are looked up
+# at once with a binary search over the sorted lemmas of their part of
+# speech. The arrays are memory-mapped, so workers share one copy of the
+# pages. No network access is needed.
+#
+# The default index can be configured with the environment variable
+#   AWE_HYPERNYMS  -- directory of the hypernym index
+
+import os
+import json
+import codecs
+
+import numpy as np
+
+# Configure Logging
+import logging, sys
+logging.basicConfig(stream=sys.stderr)
+LOGLEVEL = os.environ.get('LOGLEVEL', 'WARNING').upper()
+logging.basicConfig(level=LOGLEVEL)
+logger = logging.getLogger(__name__)
+
+# On-disk format of hypernym indices.
+HYPERNYMY_FORMAT = "instructional_awe.hypernymy"
+HYPERNYMY_FORMAT_VERSION = 2
+
+# Parts of speech of the graph.
+PARTS = ("noun", "verb")
+
+# Columns of the depth matrix.
+DEPTHS = ("min", "mean")
+
+
+class HypernymIndex(object):
+    """Array-backed hypernym graph with precomputed depths.
+    """
+
+    def __init__(self, lemmas, parts, parent_offsets, parents, depths):
+        """Creates an index from its arrays, see build() and load().
+        """
+        self.lemmas = lemmas
+        self.parts = parts
+        self.parent_offsets = parent_offsets
+        self.parents = parents
+        self.depths = depths
+        # Nodes of part i are bounds[i]:bounds[i + 1].
+        self._bounds = np.searchsorted(parts, np.arange(len(PARTS) + 1))
+
+    @classmethod
+    def build(cls, path, relations):
+        """Creates an index in the directory path from an iterable of
+        tuples (lemma, hypernym, part of speech). Returns the index.
+        """
+        nodes = dict()
+        edges = set()
+        for lemma, hypernym, part in relations:
+            if part not in PARTS:
+                raise ValueError("Unknown part of speech '%s'." % part)
+            if lemma == hypernym:
+                continue
+            child = nodes.setdefault((part, lemma), len(nodes))
+            parent = nodes.setdefault((part, hypernym), len(nodes))
+            edges.add((child, parent))
+        keys = list(nodes)
+        n = len(keys)
+        parent_lists = [[] for _ in range(n)]
+        for child, parent in sorted(edges):
+            parent_lists[child].append(parent)
+
+        # Depth first search along the hypernyms. Relations to nodes on the
+        # current path close a cycle and are dropped. Nodes are finished
+        # after their hypernyms, so depths can be computed at once.
+        state = np.zeros(n, dtype = np.int8)  # 0 new, 1 on path, 2 finished
+        min_depths = np.zeros(n, dtype = np.float64)
+        mean_depths = np.zeros(n, dtype = np.float64)
+        dropped = 0
+        for start in range(n):
+            if state[start]:
+                continue
+            state[start] = 1
+            stack = [(start, 0)]
+            while stack:
+                node, i = stack[-1]
+                if i < len(parent_lists[node]):
+                    stack[-1] = (node, i + 1)
+                    parent = parent_lists[node][i]
+                    if state[parent] == 1:
+                        parent_lists[node][i] = -1
+                        dropped += 1
+                    elif state[parent] == 0:
+                        state[parent] = 1
+                        stack.append((parent, 0))
+                    continue
+                stack.pop()
+                parent_lists[node] = [parent for parent in parent_lists[node] if parent >= 0]
+                state[node] = 2
+                if parent_lists[node]:
+                    min_depths[node] = 1 + min_depths[parent_lists[node]].min()
+                    mean_depths[node] = 1 + mean_depths[parent_lists[node]].mean()
+        if dropped:
+            logger.info("Dropped %d hypernym relations closing a cycle" % dropped)
+
+        # Renumber the nodes sorted by part of speech and lemma.
+        order = sorted(range(n), key = lambda i: (PARTS.index(keys[i][0]), keys[i][1].encode("utf-8")))
+        renumber = np.empty(n, dtype = np.int64)
+        renumber[order] = np.arange(n)
+        lemmas = np.array([keys[i][1].encode("utf-8") for i in order], dtype = "S") if n else np.array([], dtype = "S1")
+        parts = np.array([PARTS.index(keys[i][0]) for i in order], dtype = np.int8)
+        parent_offsets = np.cumsum([0] + [len(parent_lists[i]) for i in order]).astype(np.int64)
+        parents = np.array([renumber[p] for i in order for p in parent_lists[i]], dtype = np.int32)
+        depths = np.stack([min_depths[order], mean_depths[order]], axis = 1).astype(np.float32)
+
+        os.makedirs(path, exist_ok = True)
+        for name, array in [("lemmas", lemmas), ("parts", parts), ("parent_offsets", parent_offsets),
+                            ("parents", parents), ("depths", depths)]:
+            np.save(os.path.join(path, name + ".npy"), array)
+        meta = {"format": HYPERNYMY_FORMAT, "version": HYPERNYMY_FORMAT_VERSION, "nodes": n}
+        with open(os.path.join(path, "meta.json"), "w", encoding = "utf-8") as meta_file:
+            json.dump(meta, meta_file, indent = 2)
+        return cls.load(path)
+
+    @classmethod
+    def build_from_tsv(cls, path, tsv_path, encoding = 'utf-8'):
+        """Creates an index in the directory path from a tab separated
+        file with the columns lemma, hypernym and part of speech.
+        Returns the index.
+        """
+        def relations():
+            with codecs.open(tsv_path, mode = 'r', encoding = encoding) as tsv_file:
+                for line in tsv_file:
+                    fields = line.rstrip("\r\n").split("\t")
+                    if len(fields) >= 3 and fields[0] and fields[1] and fields[2] in PARTS:
+                        yield fields[0], fields[1], fields[2]
+        return cls.build(path, relations())
+
+    @classmethod
+    def load(cls, path, mmap_mode = 'r'):
+        """Loads the index in the directory path.
+
+        Keyword arguments:
+        mmap_mode -- Memory-map mode of the arrays, see numpy.load() (default 'r').
+        """
+        with open(os.path.join(path, "meta.json"), encoding = "utf-8") as meta_file:
+            meta = json.load(meta_file)
+        if meta.get("format") != HYPERNYMY_FORMAT or meta.get("version") != HYPERNYMY_FORMAT_VERSION:
+            raise ValueError("Unsupported hypernym index format in '%s'." % path)
+        arrays = [np.load(os.path.join(path, name + ".npy"), mmap_mode = mmap_mode)
+                  for name in ("lemmas", "parts", "parent_offsets", "parents", "depths")]
+        return cls(*arrays)
+
+    def __len__(self):
+        return len(self.lemmas)
+
+    def node(self, lemma, part):
+        """Returns the node of the lemma or None."""
+        node = self.nodes([lemma], part)[0]
+        return int(node) if node >= 0 else None
+
+    def nodes(self, lemmas, part):
+        """Returns array with the nodes of the given lemmas
+        (-1 for lemmas not in the graph).
+        """
+        result = np.full(len(lemmas), -1, dtype = np.int64)
+        start, stop = self._bounds[PARTS.index(part)], self._bounds[PARTS.index(part) + 1]
+        if len(lemmas) == 0 or start == stop:
+            return result
+        keys = np.char.encode(np.asarray(lemmas, dtype = str), "utf-8")
+        index = np.minimum(np.searchsorted(self.lemmas[start:stop], keys), stop - start - 1)
+        found = self.lemmas[start + index] == keys
+        result[found] = start + index[found]
+        return result
+
+    def hypernyms(self, lemma, part):
+        """Returns the direct hypernyms of the lemma."""
+        node = self.node(lemma, part)
+        if node is None:
+            return []
+        return [self.lemmas[p].decode("utf-8")
+                for p in self.parents[self.parent_offsets[node]:self.parent_offsets[node + 1]]]
+
+    def depth(self, lemma, part, kind = "mean"):
+        """Returns the depth ("min" or "mean") of the lemma or NaN."""
+        return float(self.lookup([lemma], part, kind)[0])
+
+    def lookup(self, lemmas, part, kind = "mean"):
+        """Returns array with the depths ("min" or "mean") of the given
+        lemmas (NaN for lemmas not in the graph).
+        """
+        column = DEPTHS.index(kind)
+        nodes = self.nodes(lemmas, part)
+        result = np.full(len(nodes), np.nan, dtype = np.float64)
+        found = nodes >= 0
+        result[found] = self.depths[nodes[found], column]
+        return result
+
+
+# Process-wide default index.
+_default_index = None
+
+def get_hypernym_index():
+    """Returns the process-wide default index."""
+    global _default_index
+    if _default_index is None:
+        path = os.environ.get("AWE_HYPERNYMS")
+        if not path:
+            raise ValueError("No hypernym index configured (set AWE_HYPERNYMS).")
+        _default_index = HypernymIndex.load(path)
+    return _default_index
+
+def set_hypernym_index(index):
+    """Replaces the process-wide default index."""
+    global _default_index
+    _default_index = index
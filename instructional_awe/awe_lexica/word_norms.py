@@ -0,0 +1,209 @@
+# word_norms.py - Psycholinguistic word norms (ratings) keyed by lemma.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# Coh-Metrix uses ratings of single words (age of acquisition, familiarity,
+# concreteness, imageability, meaningfulness) and the polysemy of words.
+# Ratings for german words come from different local files, e.g. the
+# concreteness predictions of Charbonnier & Wartena (2020). The files are
+# merged once into a WordNormStore:
+#   meta.json    -- format, version and names of the columns
+#   lemmas.npy   -- sorted lemmas (lower case, UTF-8 bytes)
+#   values.npy   -- float32 matrix, one row per lemma, one column per norm,
+#                   NaN for lemmas without value
+# Both arrays are memory-mapped, so workers share one copy of the pages.
+# Lemmas are looked up with a binary search over the sorted array, for all
+# lemmas of a text at once.
+#
+# Words without value are handled by a missing policy:
+#   "skip"  -- ignore the word (default),
+#   "zero"  -- use 0,
+#   "mean"  -- use the mean of the column over all lemmas of the store,
+#   number  -- use the given value.
+# Stores need not hold every norm: for a norm missing in the store, all
+# words are without value and the result is NaN.
+#
+# The default store can be configured with the environment variable
+#   AWE_WORD_NORMS  -- directory of the word norm store
+
+import os
+import csv
+import json
+import codecs
+
+import numpy as np
+
+# On-disk format of word norm stores.
+NORMS_FORMAT = "instructional_awe.word_norms"
+NORMS_FORMAT_VERSION = 1
+
+# Names of the norms used by the metrics.
+AGE_OF_ACQUISITION = "age_of_acquisition"
+FAMILIARITY = "familiarity"
+CONCRETENESS = "concreteness"
+IMAGEABILITY = "imageability"
+MEANINGFULNESS = "meaningfulness"
+POLYSEMY = "polysemy"
+
+
+def _encode(lemmas):
+    return np.char.encode(np.char.lower(np.asarray(lemmas, dtype = str)), "utf-8")
+
+
+class WordNormStore(object):
+    """Memory-mapped table of word norms keyed by lemma.
+    """
+
+    def __init__(self, lemmas, values, columns):
+        """Creates a store from its arrays, see build() and load().
+        """
+        self.lemmas = lemmas
+        self.values = values
+        self.columns = list(columns)
+        self._column_index = {column: i for i, column in enumerate(self.columns)}
+
+    @classmethod
+    def build(cls, path, norms):
+        """Creates a store in the directory path from a dictionary:
+        name of norm -> dictionary: lemma -> value. Returns the store.
+        """
+        columns = sorted(norms)
+        merged = dict()
+        for j, column in enumerate(columns):
+            for lemma, value in norms[column].items():
+                merged.setdefault(lemma.lower(), [np.nan] * len(columns))[j] = float(value)
+        # UTF-8 bytes sort like the code points.
+        keys = sorted(merged)
+        lemmas = _encode(keys) if keys else np.array([], dtype = "S1")
+        values = np.array([merged[key] for key in keys], dtype = np.float32).reshape(len(keys), len(columns))
+
+        os.makedirs(path, exist_ok = True)
+        np.save(os.path.join(path, "lemmas.npy"), lemmas)
+        np.save(os.path.join(path, "values.npy"), values)
+        meta = {"format": NORMS_FORMAT, "version": NORMS_FORMAT_VERSION, "columns": columns}
+        with open(os.path.join(path, "meta.json"), "w", encoding = "utf-8") as meta_file:
+            json.dump(meta, meta_file, indent = 2)
+        return cls.load(path)
+
+    @classmethod
+    def build_from_csv(cls, path, sources, delimiter = None, encoding = 'utf-8'):
+        """Creates a store in the directory path from CSV files.
+        Returns the store.
+
+        Keyword arguments:
+        sources -- List of tuples (path of file, name of lemma column,
+            dictionary: name of column in file -> name of norm).
+        delimiter -- Delimiter of the files (default: tab for .tsv
+            and .txt files, comma otherwise).
+        """
+        norms = dict()
+        for csv_path, lemma_column, columns in sources:
+            file_delimiter = delimiter or ("\t" if csv_path.endswith((".tsv", ".txt")) else ",")
+            with codecs.open(csv_path, mode = 'r', encoding = encoding) as csv_file:
+                for row in csv.DictReader(csv_file, delimiter = file_delimiter):
+                    lemma = (row.get(lemma_column) or "").strip()
+                    if not lemma:
+                        continue
+                    for file_column, norm in columns.items():
+                        try:
+                            value = float(row[file_column])
+                        except (KeyError, TypeError, ValueError):
+                            continue
+                        norms.setdefault(norm, dict())[lemma] = value
+        return cls.build(path, norms)
+
+    @classmethod
+    def load(cls, path, mmap_mode = 'r'):
+        """Loads the store in the directory path.
+
+        Keyword arguments:
+        mmap_mode -- Memory-map mode of the arrays, see numpy.load() (default 'r').
+        """
+        with open(os.path.join(path, "meta.json"), encoding = "utf-8") as meta_file:
+            meta = json.load(meta_file)
+        if meta.get("format") != NORMS_FORMAT or meta.get("version") != NORMS_FORMAT_VERSION:
+            raise ValueError("Unsupported word norm format in '%s'." % path)
+        lemmas = np.load(os.path.join(path, "lemmas.npy"), mmap_mode = mmap_mode)
+        values = np.load(os.path.join(path, "values.npy"), mmap_mode = mmap_mode)
+        return cls(lemmas, values, meta["columns"])
+
+    def __len__(self):
+        return len(self.lemmas)
+
+    def lookup(self, lemmas, column):
+        """Returns array with the values of the given norm for the given
+        lemmas (NaN for lemmas without value, all NaN for a norm not
+        in the store).
+        """
+        result = np.full(len(lemmas), np.nan, dtype = np.float64)
+        if len(lemmas) == 0 or len(self.lemmas) == 0 or column not in self._column_index:
+            return result
+        keys = _encode(lemmas)
+        index = np.minimum(np.searchsorted(self.lemmas, keys), len(self.lemmas) - 1)
+        found = self.lemmas[index] == keys
+        result[found] = self.values[index[found], self._column_index[column]]
+        return result
+
+    def column_mean(self, column):
+        """Returns the mean of a norm over all lemmas with value
+        (NaN for a norm not in the store)."""
+        if column not in self._column_index or len(self.lemmas) == 0:
+            return float("nan")
+        return float(np.nanmean(self.values[:, self._column_index[column]]))
+
+    def mean(self, lemmas, column, missing = "skip"):
+        """Returns the mean of the given norm for the given lemmas, with
+        the given missing policy (see above). NaN, if no lemma has a value.
+        """
+        return self.aggregate(self.lookup(lemmas, column), column, missing)
+
+    def aggregate(self, values, column, missing = "skip"):
+        """Returns the mean of values returned by lookup() for the given
+        norm, with the given missing policy.
+        """
+        values = np.array(values, dtype = np.float64)
+        if column not in self._column_index:
+            return float("nan")
+        unknown = np.isnan(values)
+        if missing == "skip":
+            values = values[~unknown]
+        elif missing == "zero":
+            values[unknown] = 0
+        elif missing == "mean":
+            values[unknown] = self.column_mean(column)
+        elif isinstance(missing, (int, float)):
+            values[unknown] = missing
+        else:
+            raise ValueError("Unknown missing policy '%s'." % missing)
+        if len(values) == 0:
+            return float("nan")
+        return float(values.mean())
+
+
+# Process-wide default store.
+_default_store = None
+
+def get_word_norms():
+    """Returns the process-wide default store."""
+    global _default_store
+    if _default_store is None:
+        path = os.environ.get("AWE_WORD_NORMS")
+        if not path:
+            raise ValueError("No word norm store configured (set AWE_WORD_NORMS).")
+        _default_store = WordNormStore.load(path)
+    return _default_store
+
+def set_word_norms(store):
+    """Replaces the process-wide default store."""
+    global _default_store
+    _default_store = store
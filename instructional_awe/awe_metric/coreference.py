@@ -32,11 +32,12 @@
 #   in a paragraph. When all possible pairs of sentences are considered, there is the distinction
 #   between weighted and unweighted metrics that are sensitive to the distance between sentences.“
 
-import pyphen
 import statistics
-import nltk
 
-from itertools import combinations
+import numpy as np
+from scipy import sparse
+
+from .metric import Metric, STATISTICS
 
 # Matching tags for pronouns.
 pronoun_tags = ['PDS', 'PIS', 'PWS', 'PPER' ]
@@ -84,19 +85,11 @@ def global_noun_overlap(text):
     Nouns are identified by part-of-speech tagging using the
     HanTa PoS-Tagger (HanoverTagger).
     """
-    # Iterate over sentences and compare sets of nouns. Increment
-    # counter each time if an overlap is found. Divide by total
-    # number of comparisons.
-    count_noun_overlap = 0
+    # Count sentence pairs with overlapping nouns.
+    # Divide by total number of comparisons.
     count_comparisons = ((len(text.sentences) - 1) * len(text.sentences)) / 2
-    # Use tagged sentences (a sentence is a list of triples)
-    for pair in combinations(text.tagged_sentences(), 2):
-        nouns = {tag[0] for tag in pair[0] if tag[2] in noun_tags}
-        other_nouns = {tag[0] for tag in pair[1] if tag[2] in noun_tags}
-        if nouns.intersection(other_nouns):
-            count_noun_overlap += 1
-    # Return average occurance relative to number of sentences.
-    # First sentence does not have a previous sentence.
+    nouns, = _incidence_matrices(text.token_table(), [('tokens', noun_tags)])
+    count_noun_overlap = _pair_overlaps(nouns).nnz
     return count_noun_overlap / count_comparisons
 
 def local_argument_overlap(text):
@@ -121,7 +114,7 @@ def local_argument_overlap(text):
     for sentence in text.tagged_sentences():
         # Use lemma comparison for nouns to ignore plural/singular differences.
         arguments = {tag[0] for tag in sentence if tag[2] in pronoun_tags}
-        arguments.union({tag[1] for tag in sentence if tag[2] in noun_tags})
+        arguments |= {tag[1] for tag in sentence if tag[2] in noun_tags}
         if arguments.intersection(prev_arguments):
             count_argument_overlap += 1
         prev_arguments = arguments
@@ -140,22 +133,13 @@ def global_argument_overlap(text):
     Nouns and pronouns are identified by part-of-speech tagging
     using the HanTa PoS-Tagger (HanoverTagger).
     """
-    # Iterate over sentences and compare sets of nouns. Increment
-    # counter each time if an overlap is found. Divide by total
-    # number of comparisons.
-    count_noun_overlap = 0
+    # Count sentence pairs with overlapping pronouns or noun lemmas.
+    # Divide by total number of comparisons.
     count_comparisons = ((len(text.sentences) - 1) * len(text.sentences)) / 2
-    # Use tagged sentences (a sentence is a list of triples)
-    for pair in combinations(text.tagged_sentences(), 2):
-        nouns = {tag[0] for tag in pair[0] if tag[2] in pronoun_tags}
-        nouns.union({tag[1] for tag in pair[0] if tag[2] in noun_tags})
-        other_nouns = {tag[0] for tag in pair[1] if tag[2] in pronoun_tags}
-        other_nouns.union({tag[1] for tag in pair[1] if tag[2] in noun_tags})
-        if nouns.intersection(other_nouns):
-            count_noun_overlap += 1
-    # Return average occurance relative to number of sentences.
-    # First sentence does not have a previous sentence.
-    return count_noun_overlap / count_comparisons
+    # Use lemma comparison for nouns to ignore plural/singular differences.
+    arguments, = _incidence_matrices(text.token_table(), [('tokens', pronoun_tags), ('lemmas', noun_tags)])
+    count_argument_overlap = _pair_overlaps(arguments).nnz
+    return count_argument_overlap / count_comparisons
 
 def local_stem_overlap(text):
     """Returns the adjacent stem overlap.
@@ -192,21 +176,14 @@ def global_stem_overlap(text):
     Nouns, content words and pronouns  are identified by
     part-of-speech tagging using the HanTa PoS-Tagger (HanoverTagger).
     """
-    # Iterate over sentences and compare sets of nouns. Increment
-    # counter each time if an overlap is found. Divide by total
-    # number of comparisons.
-    count_stem_overlap = 0
+    # Count sentence pairs, where pronouns or noun stems of the first
+    # sentence overlap with pronouns or content word stems of the
+    # second sentence. Divide by total number of comparisons.
     count_comparisons = ((len(text.sentences) - 1) * len(text.sentences)) / 2
-    # Use tagged sentences (a sentence is a list of triples)
-    for pair in combinations(text.tagged_sentences(taglevel = 2), 2):
-        stemms = {tag[0] for tag in pair[0] if tag[2] in pronoun_tags}
-        stemms.union({tag[1] for tag in pair[0] if tag[2] in noun_tags})
-        other_stemms = {tag[0] for tag in pair[1] if tag[2] in pronoun_tags}
-        other_stemms.union({tag[1] for tag in pair[1] if tag[2] in content_word_tags})
-        if stemms.intersection(other_stemms):
-            count_stem_overlap += 1
-    # Return average occurance relative to number of sentences.
-    # First sentence does not have a previous sentence.
+    stemms, other_stemms = _incidence_matrices(text.token_table(),
+        [('tokens', pronoun_tags), ('stems', noun_tags)],
+        [('tokens', pronoun_tags), ('stems', content_word_tags)])
+    count_stem_overlap = _pair_overlaps(stemms, other_stemms).nnz
     return count_stem_overlap / count_comparisons
 
 def local_content_words_overlap(text):
@@ -227,13 +204,14 @@ def local_content_words_overlap(text):
         content_words = {tag[0] for tag in sentence if tag[2] in content_word_tags}
         count_inter = len(content_words.intersection(prev_content_words))
         count_union = len(content_words.union(prev_content_words))
-        content_word_proportion =  count_inter / count_union
+        # Sentences without content words do not overlap.
+        content_word_proportion =  count_inter / count_union if count_union else 0
         content_word_overlap.append(content_word_proportion)
         prev_content_words = content_words
 
     # The first comparison in the loop above performs
     # an empty comparison. Here we remove the first value.
-    content_word_overlap.popleft()
+    content_word_overlap.pop(0)
 
     return statistics.mean(content_word_overlap), statistics.stdev(content_word_overlap), len(content_word_overlap)
 
@@ -246,21 +224,18 @@ def global_content_words_overlap(text):
     Content words are identified by part-of-speech tagging
      using the HanTa PoS-Tagger (HanoverTagger).
     """
-    # Iterate over sentences and compare sets of content words.
-    # Append overlap proportion to list and report statistics.
-    content_word_overlap = []
+    # Compute overlap proportion (intersection over union)
+    # for every sentence pair and report statistics.
     count_comparisons = ((len(text.sentences) - 1) * len(text.sentences)) / 2
-    # Use tagged sentences (a sentence is a list of triples)
-    for pair in combinations(text.tagged_sentences(), 2):
-        content_words = {tag[0] for tag in pair[0] if tag[2] in content_word_tags}
-        other_content_words = {tag[0] for tag in pair[1] if tag[2] in content_word_tags}
-        count_inter = len(content_words.intersection(other_content_words))
-        count_union = len(content_words.union(other_content_words))
-        content_word_proportion =  count_inter / count_union
-        content_word_overlap.append(content_word_proportion)
-    # Return average occurance relative to number of sentences.
-    # First sentence does not have a previous sentence.
-    return statistics.mean(content_word_overlap), statistics.stdev(content_word_overlap), count_comparisons
+    content_words, = _incidence_matrices(text.token_table(), [('tokens', content_word_tags)])
+    first, second = np.triu_indices(content_words.shape[0], k = 1)
+    count_inter = np.asarray(_pair_overlaps(content_words).todense())[first, second]
+    sizes = np.asarray(content_words.sum(axis = 1)).ravel()
+    count_union = sizes[first] + sizes[second] - count_inter
+    # Sentences without content words do not overlap.
+    content_word_overlap = np.divide(count_inter, count_union,
+        out = np.zeros(len(count_inter)), where = count_union > 0)
+    return float(content_word_overlap.mean()), float(content_word_overlap.std(ddof = 1)), count_comparisons
 
 
 
@@ -268,6 +243,45 @@ def global_content_words_overlap(text):
 
 # Helper methods
 
+def _incidence_matrices(table, *features):
+    """Returns one binary sparse sentence × term matrix for every
+    given list of features. A feature is a pair (column, taglist):
+    the strings of the column ('tokens', 'lemmas' or 'stems') of all
+    tokens with a PoS-tag in taglist. All matrices share the same terms.
+    """
+    columns = sorted({column for feature in features for column, _ in feature})
+    vocabularies = [getattr(table, column) for column in columns]
+    # Terms are compared as strings over all columns.
+    terms, term_ids = np.unique(np.concatenate(vocabularies), return_inverse = True)
+    offsets = dict(zip(columns, np.cumsum([0] + [len(v) for v in vocabularies])))
+    matrices = []
+    for feature in features:
+        rows = []
+        cols = []
+        for column, taglist in feature:
+            mask = table.pos_mask(taglist)
+            ids = getattr(table, column[:-1] + '_ids')[mask]
+            rows.append(table.sentence_index[mask])
+            cols.append(term_ids[offsets[column] + ids])
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        matrix = sparse.csr_matrix((np.ones(len(rows), dtype = np.int32), (rows, cols)),
+                                   shape = (table.number_of_sentences, len(terms)))
+        # Sets of terms: count every term once per sentence.
+        matrix.data[:] = 1
+        matrices.append(matrix)
+    return matrices
+
+def _pair_overlaps(matrix, other_matrix = None):
+    """Returns sparse matrix with the number of overlapping terms
+    for all sentence pairs i < j (upper triangle).
+    """
+    if other_matrix is None:
+        other_matrix = matrix
+    overlaps = sparse.triu(matrix @ other_matrix.T, k = 1).tocsr()
+    overlaps.eliminate_zeros()
+    return overlaps
+
 def _pos_list_all(text):
     return [tag[2] for tag in text.tagged_words()]
 
@@ -278,3 +292,65 @@ def _pos_list_words(text):
 def _list_words(text):
     not_words = ["XY", "$.", "$,", "$("]
     return [tag[0] for tag in text.tagged_words() if tag[2] not in not_words]
+
+
+# Metrics
+# =======
+
+class LocalNounOverlap(Metric):
+    name = "local_noun_overlap"
+    code = "CRFNO1"
+    description = "Noun overlap, adjacent sentences"
+    requires = ("tagged_sentences",)
+    taglevels = (1,)
+
+class GlobalNounOverlap(Metric):
+    name = "global_noun_overlap"
+    code = "CRFNOa"
+    description = "Noun overlap, all sentences"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class LocalArgumentOverlap(Metric):
+    name = "local_argument_overlap"
+    code = "CRFAO1"
+    description = "Argument overlap, adjacent sentences"
+    requires = ("tagged_sentences",)
+    taglevels = (1,)
+
+class GlobalArgumentOverlap(Metric):
+    name = "global_argument_overlap"
+    code = "CRFAOa"
+    description = "Argument overlap, all sentences"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class LocalStemOverlap(Metric):
+    name = "local_stem_overlap"
+    code = "CRFSO1"
+    description = "Stem overlap, adjacent sentences"
+    requires = ("tagged_sentences",)
+    taglevels = (2,)
+
+class GlobalStemOverlap(Metric):
+    name = "global_stem_overlap"
+    code = "CRFSOa"
+    description = "Stem overlap, all sentences"
+    requires = ("token_table",)
+    taglevels = (1, 2)
+
+class LocalContentWordOverlap(Metric):
+    name = "local_content_words_overlap"
+    code = "CRFCWO1"
+    description = "Content word overlap, adjacent sentences"
+    requires = ("tagged_sentences",)
+    taglevels = (1,)
+    returns = STATISTICS
+
+class GlobalContentWordOverlap(Metric):
+    name = "global_content_words_overlap"
+    code = "CRFCWOa"
+    description = "Content word overlap, all sentences"
+    requires = ("token_table",)
+    taglevels = (1,)
+    returns = STATISTICS
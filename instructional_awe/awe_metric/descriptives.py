@@ -28,10 +28,8 @@
 #   „Coh-Metrix provides descriptive indices to help the user check the Coh-Metrix output
 #   (e.g., to make sure that the numbers make senes) and interpret patterns of data.“
 
-from .metric import Metric
-import pyphen
+from .metric import Metric, STATISTICS
 import statistics
-import nltk
 
 
 def number_of_paragraphs(text):
@@ -46,60 +44,69 @@ def number_of_sentences(text):
     """
     return len(text.sentences)
 
-def number_of_words(text):
+def number_of_words(text, token_table = None):
     """Returns the total number of words in the text.
     Words are identified by the nltk tokenizer. 
     """
-    return len(_pos_list_words(text))
+    if token_table is None:
+        token_table = text.token_table()
+    return int(token_table.word_mask().sum())
 
 
-def paragraph_length_in_sentences(text):
+def paragraph_length_in_sentences(text, token_table = None, number_of_sentences = None):
     """Returns the mean length (and standard deviation) of paragraphs.
     This is the average number of sentences in each paragraph within the text.
     """
-    language, _ = text.language()
-    sentence_counts = [len(
-        nltk.sent_tokenize(paragraph, language = language)
-    ) for paragraph in text.paragraphs]
-    return statistics.mean(sentence_counts), statistics.stdev(sentence_counts), number_of_sentences(text)
+    table = token_table if token_table is not None else text.token_table()
+    if number_of_sentences is None:
+        number_of_sentences = len(text.sentences)
+    sentence_counts = table.sentences_per_paragraph()
+    return (*_mean_stdev(sentence_counts), number_of_sentences)
 
-def sentence_length_in_words(text):
+def sentence_length_in_words(text, token_table = None, number_of_words = None):
     """Returns the mean number of words (and standard deviation) of sentences.
     This is the average number of words in each sentence within the text,
     where a word is anything that is tagged as a part-of-speech by the
     HanTa PoS-Tagger (HanoverTagger).
     """
-    # PoS-Tags for punctuation or unknown parts of speech.
-    not_words = ["XY", "$.", "$,", "$("]
-    word_counts = [len(
-        [word for word in sentence if word[1] not in not_words]
-    ) for sentence in text.tagged_sentences()]
-    return statistics.mean(word_counts), statistics.stdev(word_counts), number_of_words(text)
-
-def word_length_in_syllables(text):
+    table = token_table if token_table is not None else text.token_table()
+    # Ignore punctuation or unknown parts of speech.
+    word_mask = table.word_mask()
+    word_counts = table.count_per_sentence(word_mask)
+    if number_of_words is None:
+        number_of_words = int(word_mask.sum())
+    return (*_mean_stdev(word_counts), number_of_words)
+
+def word_length_in_syllables(text, token_table = None):
     """Returns the mean number of syllables (and standard deviation) in words.
     Syllables are identified by hyphenation rules using the pyphens included dictionary.
     """
-    # Get dictiornary for hyphenation.
-    _, lang = text.language()
-    dictionary = pyphen.Pyphen(lang = lang)
+    table = token_table if token_table is not None else text.token_table()
     # number of positions for hyphenization plus 1 for each word
-    syllable_counts = [(len(dictionary.positions(word)) + 1) for word in _list_words(text)]
-    number_of_syllables = sum(syllable_counts)
-    return statistics.mean(syllable_counts), statistics.stdev(syllable_counts), number_of_syllables
+    syllable_counts = table.syllable_counts[table.word_mask()]
+    number_of_syllables = int(syllable_counts.sum())
+    return (*_mean_stdev(syllable_counts), number_of_syllables)
 
-def word_length_in_characters(text):
+def word_length_in_characters(text, token_table = None):
     """Returns the mean number of letters ()and standard deviation) in words.
     This is the average number of letters for all of the words in the text.
     """
-    # number of characters for hyphenization plus 1 for each word
-    character_counts = [len(word) for word in _list_words(text)]
-    number_of_characters = sum(character_counts)
-    return statistics.mean(character_counts), statistics.stdev(character_counts), number_of_characters
+    table = token_table if token_table is not None else text.token_table()
+    character_counts = table.character_lengths[table.word_mask()]
+    number_of_characters = int(character_counts.sum())
+    return (*_mean_stdev(character_counts), number_of_characters)
 
 
 ## Helper methods
 
+def _mean_stdev(values):
+    """Returns mean and sample standard deviation of a NumPy array
+    (like statistics.mean() and statistics.stdev()).
+    """
+    if len(values) < 2:
+        raise statistics.StatisticsError('stdev requires at least two data points')
+    return float(values.mean()), float(values.std(ddof = 1))
+
 def _pos_list_all(text):
     return [tag[2] for tag in text.tagged_words()]
 
@@ -110,3 +117,58 @@ def _pos_list_words(text):
 def _list_words(text):
     not_words = ["XY", "$.", "$,", "$("]
     return [tag[0] for tag in text.tagged_words() if tag[2] not in not_words]
+
+
+# Metrics
+# =======
+
+class ParagraphCount(Metric):
+    name = "number_of_paragraphs"
+    code = "DESPC"
+    description = "Number of paragraphs"
+    requires = ("paragraphs",)
+
+class SentenceCount(Metric):
+    name = "number_of_sentences"
+    code = "DESSC"
+    description = "Number of sentences"
+    requires = ("sentences",)
+
+class WordCount(Metric):
+    name = "number_of_words"
+    code = "DESWC"
+    description = "Number of words"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class ParagraphLength(Metric):
+    name = "paragraph_length_in_sentences"
+    code = "DESPL"
+    description = "Paragraph length in sentences"
+    requires = ("token_table",)
+    taglevels = (1,)
+    returns = STATISTICS
+
+class SentenceLength(Metric):
+    name = "sentence_length_in_words"
+    code = "DESSL"
+    description = "Sentence length in words"
+    requires = ("token_table",)
+    taglevels = (1,)
+    returns = STATISTICS
+
+class WordLengthSyllables(Metric):
+    name = "word_length_in_syllables"
+    code = "DESWLsy"
+    description = "Word length in syllables"
+    requires = ("token_table",)
+    taglevels = (1,)
+    returns = STATISTICS
+
+class WordLengthLetters(Metric):
+    name = "word_length_in_characters"
+    code = "DESWLlt"
+    description = "Word length in letters"
+    requires = ("token_table",)
+    taglevels = (1,)
+    returns = STATISTICS
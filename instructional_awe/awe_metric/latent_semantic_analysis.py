@@ -3,79 +3,104 @@
 # Implements LSASS, LSAPP, LSAGN.
 #
 
-from ..awe_text_representation.text import Text
+from .metric import Metric, STATISTICS
 
-from itertools import combinations
-import statistics
+import numpy as np
 
 
 def local_lsa_overlap_sentences(text, space):
     """Returns mean and standard derivation of cosine similarities between
     adjacent sentences as measure of text cohesion.
     """
-    cosines = []
-    # Use one whitespace to generate empty Text object
-    # Text uses strip() on initialization.
-    last_sentence = Text(plaintext = " ")
-    for sent in text.sentences:
-        sentence = Text(plaintext = sent)
-        if last_sentence.plaintext != "":
-            cosines.append( space.cosine(sentence, last_sentence) )
-        last_sentence = sentence
-    if len(cosines) > 1:
-        return statistics.mean(cosines), statistics.stdev(cosines), len(cosines)
-    else:
-        return cosines[0], 0, len(cosines)
+    return local_cosine_statistics(sentence_cosines(text, space))
 
 def global_lsa_overlap_sentences(text, space):
     """Returns mean and standard derivation of cosine similarities between
      sentences as measure of text cohesion.
     """
-    # Iterate over sentences and compute cosines
-    # counter each time if an overlap is found. Divide by total
-    # number of comparisons.
-    cosines = []
-    for pair in combinations(text.sentences, 2):
-        sentence = Text(plaintext = pair[0])
-        other_sentence = Text(plaintext = pair[1])
-        cosines.append( space.cosine(sentence, other_sentence) )
-    if len(cosines) > 1:
-        return statistics.mean(cosines), statistics.stdev(cosines), len(cosines)
-    else:
-        return cosines[0], 0, len(cosines)
+    return global_cosine_statistics(sentence_cosines(text, space))
 
 def local_lsa_overlap_paragraphs(text, space):
     """Returns mean and standard derivation of cosine similarities between
     adjacent sentences as measure of text cohesion.
     """
-    cosines = []
-    last_paragraph = ""
-    for para in text.paragraphs:
-        paragraph = Text(plaintext = para)
-        if last_paragraph != "":
-            cosines.append( space.cosine(paragraph, last_paragraph) )
-        last_paragraph = paragraph
-    if len(cosines) > 1:
-        return statistics.mean(cosines), statistics.stdev(cosines), len(cosines)
-    else:
-        return cosines[0], 0, len(cosines)
+    return local_cosine_statistics(paragraph_cosines(text, space))
 
 def global_lsa_overlap_paragraphs(text, space):
     """Returns mean and standard derivation of cosine similarities between
      paragraphs as measure of text cohesion.
     """
-    # Iterate over paragraphs and compute cosines.
-    cosines = []
-    for pair in combinations(text.paragraphs, 2):
-        paragraph = Text(plaintext = pair[0])
-        other_paragraph = Text(plaintext = pair[1])
-        cosines.append( space.cosine(paragraph, other_paragraph) )
-    if len(cosines) > 1:
-        return statistics.mean(cosines), statistics.stdev(cosines), len(cosines)
-    else:
-        return cosines[0], 0, len(cosines)
+    return global_cosine_statistics(paragraph_cosines(text, space))
 
 def lsa_overlap_given_new_sentences(text, space):
     """Returns [TODO]
     """
     raise NotImplementedError
+
+
+# Helper methods
+#   All sentences (or paragraphs) of the text are projected on the semantic
+#   space once. The cosines of all pairs are given by one matrix product.
+#   Sentences and paragraphs are views sharing the tags of the text.
+
+def sentence_cosines(text, space):
+    """Returns matrix of cosine similarities between all sentences of the text."""
+    return space.cosine_matrix([text.sentence_view(i) for i in range(len(text.sentences))])
+
+def paragraph_cosines(text, space):
+    """Returns matrix of cosine similarities between all paragraphs of the text."""
+    return space.cosine_matrix([text.paragraph_view(j) for j in range(len(text.paragraphs))])
+
+def local_cosine_statistics(cosines):
+    """Returns mean, standard derivation and number of the cosine
+    similarities between adjacent sentences (or paragraphs).
+    """
+    return _statistics(np.diagonal(cosines, offset = 1))
+
+def global_cosine_statistics(cosines):
+    """Returns mean, standard derivation and number of the cosine
+    similarities between all pairs of sentences (or paragraphs).
+    """
+    return _statistics(cosines[np.triu_indices(len(cosines), k = 1)])
+
+def _statistics(cosines):
+    if len(cosines) > 1:
+        return float(cosines.mean()), float(cosines.std(ddof = 1)), len(cosines)
+    else:
+        return float(cosines[0]), 0, len(cosines)
+
+
+# Metrics
+# =======
+
+class LocalLSAOverlapSentences(Metric):
+    name = "local_lsa_overlap_sentences"
+    code = "LSASS1"
+    description = "LSA overlap, adjacent sentences"
+    requires = ("sentences", "space")
+    taglevels = (1,)
+    returns = STATISTICS
+
+class GlobalLSAOverlapSentences(Metric):
+    name = "global_lsa_overlap_sentences"
+    code = None
+    description = "LSA overlap, all sentences"
+    requires = ("sentences", "space")
+    taglevels = (1,)
+    returns = STATISTICS
+
+class LocalLSAOverlapParagraphs(Metric):
+    name = "local_lsa_overlap_paragraphs"
+    code = "LSAPP1"
+    description = "LSA overlap, adjacent paragraphs"
+    requires = ("paragraphs", "space")
+    taglevels = (1,)
+    returns = STATISTICS
+
+class GlobalLSAOverlapParagraphs(Metric):
+    name = "global_lsa_overlap_paragraphs"
+    code = None
+    description = "LSA overlap, all paragraphs"
+    requires = ("paragraphs", "space")
+    taglevels = (1,)
+    returns = STATISTICS
@@ -0,0 +1,123 @@
+# metric.py - Base class and registry of metrics.
+#
+# Based on Coh-Metrix-Port's functionalities from
+# Andre Luiz Verucci da Cunha [Copyright (C) 2014] published
+# under GNU General Public License as published by the Free
+# Software Foundation.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# Every metric module declares one Metric class per implemented index.
+# The class describes the metric (Coh-Metrix code, which Text
+# representations it needs, what it returns) and names the node of the
+# MetricReport, which computes its value. Subclasses are registered
+# automatically. A deployment can select a subset of indices by code:
+#
+#   reports = compute_reports(texts, ["DESWC", "CRFNO1", "LSASS1"], space = space)
+#
+# See also: https://github.com/nilc-nlp/coh-metrix-port
+
+# Registered metrics: name -> Metric class.
+_registry = {}
+
+# Return value of metrics reporting statistics.
+STATISTICS = "(mean, stdev, count)"
+
+# Representations every Text object provides. All other requirements
+# of a metric are further inputs, e.g. a semantic space.
+TEXT_REPRESENTATIONS = {"paragraphs", "sentences", "tagged_sentences", "token_table"}
+
+
+class Metric(object):
+    """Base class of a metric.
+
+    Attributes of subclasses:
+    name -- Name of the metric, also the name of the MetricReport node
+        (and usually of the function) computing the metric.
+    code -- Coh-Metrix code of the metric, e.g. "DESPC" (None, if Coh-Metrix
+        has no such index).
+    description -- Short description of the metric.
+    requires -- Text representations or inputs the metric needs, e.g.
+        "paragraphs", "sentences", "tagged_sentences", "token_table", "space".
+    taglevels -- HanoverTagger taglevels of the tagged sentences the
+        metric needs.
+    returns -- Type of the returned value, e.g. "float" or STATISTICS.
+    """
+
+    name = None
+    code = None
+    description = ""
+    requires = ()
+    taglevels = ()
+    returns = "float"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.name:
+            _registry[cls.name] = cls
+
+    @classmethod
+    def inputs(cls):
+        """Returns the names of the inputs (besides the text) the metric needs."""
+        return set(cls.requires) - TEXT_REPRESENTATIONS
+
+    @classmethod
+    def value_for_report(cls, report):
+        """Returns the value of the metric from a MetricReport."""
+        return report[cls.name]
+
+    @classmethod
+    def value_for_text(cls, text, **inputs):
+        """Computes the value of the metric for a text."""
+        from .report import MetricReport
+        return MetricReport(text, [cls.name], **inputs)[cls.name]
+
+
+def registered_metrics():
+    """Returns the registered Metric classes."""
+    _load_metric_modules()
+    return list(_registry.values())
+
+def get_metric(key):
+    """Returns the Metric class for a name or Coh-Metrix code."""
+    _load_metric_modules()
+    if key in _registry:
+        return _registry[key]
+    for metric in _registry.values():
+        if metric.code == key:
+            return metric
+    raise ValueError("Unknown metric '%s'." % key)
+
+def compute_reports(texts, metrics = None, **inputs):
+    """Computes the given metrics (names or Coh-Metrix codes, default:
+    all metrics, which only need the text and the given inputs) for
+    many texts. Texts are tagged in one pass for all taglevels the
+    selected metrics need. Returns one dictionary per text with the
+    values by metric name.
+    """
+    from ..awe_text_representation.text import tag_corpus
+    from .report import MetricReport
+
+    texts = list(texts)
+    if metrics is None:
+        selected = [m for m in registered_metrics() if m.inputs() <= set(inputs)]
+    else:
+        selected = [get_metric(key) for key in metrics]
+    for taglevel in sorted({level for m in selected for level in m.taglevels}):
+        tag_corpus(texts, taglevel)
+    names = [m.name for m in selected]
+    return [MetricReport(text, names, **inputs).compute() for text in texts]
+
+def _load_metric_modules():
+    # Metric classes are registered when the metric modules are imported.
+    from . import report
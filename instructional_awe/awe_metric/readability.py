@@ -2,7 +2,7 @@
 #
 
 from . import descriptives
-import pyphen
+from .metric import Metric
 
 def lesbarkeitsindex_LIX(text):
     """Calculate the value of the metric in the text.
@@ -16,18 +16,19 @@ def lesbarkeitsindex_LIX(text):
 
     Returns: an appropriate data structure for the corresponding to the metric.
     """
-    # Get dictiornary for hyphenation.
-    language, lang = text.language()
-    dictionary = pyphen.Pyphen(lang = lang)
-
-    # Durchschnittliche Satzlänge (in Wörtern)
-    average_sentence_length = descriptives.number_of_words(text) / len(text.sentences)
-    # Prozentanteil der langen Wörter mit mehr als sechs Buchstaben
-    percentage_of_long_words = len([word for word in [w for w in descriptives._list_words(text)] if len(word) > 6]) / descriptives.number_of_words(text)
-
+    language, _ = text.language()
+    return compute_lesbarkeitsindex_LIX(
+        language,
+        average_sentence_length(text),
+        percentage_of_long_words(text))
+
+def compute_lesbarkeitsindex_LIX(language, average_sentence_length, percentage_of_long_words):
+    """Lesbarkeitsindex LIX from the average sentence length (in words)
+    and the percentage of long words (more than six letters).
+    """
     match language:
         case "german":
-            return average_sentence_length + (100 * percentage_of_long_words)
+            return average_sentence_length + percentage_of_long_words
         case "englisch":
             raise ValueError("No valid language given for Wiener Sachtextformel index.")
         case _:
@@ -48,24 +49,21 @@ def wiener_sachtextformel(text):
 
     Returns: an appropriate data structure for the corresponding to the metric.
     """
-    # Get dictiornary for hyphenation.
-    language, lang = text.language()
-    dictionary = pyphen.Pyphen(lang = lang)
-
-    # MS ist der Prozentanteil der Wörter mit drei oder mehr Silben, [Wikipedia]
-    #   (number of syllables = number of positions for hyphenization plus 1)
-    ms = len([word for word in [w for w in descriptives._list_words(text)] if len(dictionary.positions(word)) + 1 >= 3]) / descriptives.number_of_words(text)
-    ms = 100 * ms
-    # SL ist die mittlere Satzlänge (Anzahl Wörter), [Wikipedia]
-    sl = descriptives.number_of_words(text) / len(text.sentences)
-    # IW ist der Prozentanteil der Wörter mit mehr als sechs Buchstaben, [Wikipedia]
-    iw = len([word for word in [w for w in descriptives._list_words(text)] if len(word) > 6]) / descriptives.number_of_words(text)
-    iw = 100 * iw
-    # ES ist der Prozentanteil der einsilbigen Wörter. [Wikipedia]
-    #   (number of syllables = number of positions for hyphenization plus 1)
-    es = len([word for word in [w for w in descriptives._list_words(text)] if len(dictionary.positions(word)) + 1 == 1]) / descriptives.number_of_words(text)
-    es = 100 * es
-
+    language, _ = text.language()
+    return compute_wiener_sachtextformel(
+        language,
+        percentage_of_polysyllabic_words(text),
+        average_sentence_length(text),
+        percentage_of_long_words(text),
+        percentage_of_monosyllabic_words(text))
+
+def compute_wiener_sachtextformel(language, ms, sl, iw, es):
+    """Wiener Sachtextformel from
+    MS, the percentage of words with three or more syllables,
+    SL, the average sentence length (in words),
+    IW, the percentage of words with more than six letters and
+    ES, the percentage of words with one syllable. [Wikipedia]
+    """
     match language:
         case "german":
             return (0.1935 * ms) + (0.1672 * sl) + (0.1297 * iw) - (0.0327 * es) - 0.875
@@ -85,17 +83,16 @@ def flesch_reading_ease(text):
 
     Returns: an appropriate data structure for the corresponding to the metric.
     """
-
-    # Get dictiornary for hyphenation.
-    language, lang = text.language()
-    dictionary = pyphen.Pyphen(lang = lang)
-
-    # Average Sentence Length (ASL)
-    average_sentence_length = descriptives.number_of_words(text) / len(text.sentences)
-    # Average Number of Syllables per Word (ASW)
-    #   (number of syllables = number of positions for hyphenization plus 1)
-    average_syllables_per_word = sum([len(dictionary.positions(word)) + 1 for word in [word for word in descriptives._list_words(text)]]) / descriptives.number_of_words(text)
-
+    language, _ = text.language()
+    return compute_flesch_reading_ease(
+        language,
+        average_sentence_length(text),
+        average_syllables_per_word(text))
+
+def compute_flesch_reading_ease(language, average_sentence_length, average_syllables_per_word):
+    """Flesch-Reading-Ease from the Average Sentence Length (ASL)
+    and the Average Number of Syllables per Word (ASW).
+    """
     match language:
         case "german":
             return 206.835 - (1.015 * average_sentence_length) - (84.6 * average_syllables_per_word)
@@ -103,3 +100,70 @@ def flesch_reading_ease(text):
             return 164.835 - (1.000 * average_sentence_length) - (58.5 * average_syllables_per_word)
         case _:
             raise ValueError("No valid language given for flesch index.")
+
+
+## Helper methods
+#  Syllables are counted with the pyphen dictionary of the TokenTable
+#  (number of syllables = number of positions for hyphenization plus 1).
+
+def average_sentence_length(text, number_of_words = None):
+    """Returns the average sentence length (in words)."""
+    if number_of_words is None:
+        number_of_words = descriptives.number_of_words(text)
+    return number_of_words / len(text.sentences)
+
+def average_syllables_per_word(text, number_of_words = None):
+    """Returns the average number of syllables per word."""
+    table = text.token_table()
+    if number_of_words is None:
+        number_of_words = descriptives.number_of_words(text)
+    return int(table.syllable_counts[table.word_mask()].sum()) / number_of_words
+
+def percentage_of_long_words(text, number_of_words = None):
+    """Returns the percentage of words with more than six letters."""
+    table = text.token_table()
+    if number_of_words is None:
+        number_of_words = descriptives.number_of_words(text)
+    long_words = int((table.character_lengths[table.word_mask()] > 6).sum())
+    return 100 * long_words / number_of_words
+
+def percentage_of_polysyllabic_words(text, number_of_words = None):
+    """Returns the percentage of words with three or more syllables."""
+    table = text.token_table()
+    if number_of_words is None:
+        number_of_words = descriptives.number_of_words(text)
+    polysyllabic_words = int((table.syllable_counts[table.word_mask()] >= 3).sum())
+    return 100 * polysyllabic_words / number_of_words
+
+def percentage_of_monosyllabic_words(text, number_of_words = None):
+    """Returns the percentage of words with one syllable."""
+    table = text.token_table()
+    if number_of_words is None:
+        number_of_words = descriptives.number_of_words(text)
+    monosyllabic_words = int((table.syllable_counts[table.word_mask()] == 1).sum())
+    return 100 * monosyllabic_words / number_of_words
+
+
+# Metrics
+# =======
+
+class LesbarkeitsindexLIX(Metric):
+    name = "lesbarkeitsindex_LIX"
+    code = None
+    description = "Lesbarkeitsindex LIX"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class WienerSachtextformel(Metric):
+    name = "wiener_sachtextformel"
+    code = None
+    description = "Wiener Sachtextformel"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class FleschReadingEase(Metric):
+    name = "flesch_reading_ease"
+    code = "RDFRE"
+    description = "Flesch Reading Ease"
+    requires = ("token_table",)
+    taglevels = (1,)
@@ -0,0 +1,353 @@
+# report.py - Computes many metrics for a text with shared intermediate results.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# Usually we compute a full vector of indices for every text. Many
+# metrics need the same intermediate results (number of words, number
+# of sentences, syllable counts, …). A MetricReport computes every
+# intermediate result once and shares it between the requested metrics.
+#
+# Metrics and intermediate results are nodes of a dependency graph.
+# A node is a function; the names of its parameters are the names of the
+# nodes it depends on. Metrics are requested by name or Coh-Metrix code
+# (see metric.py), the node of a metric has the name of the metric. The
+# node "text" is the Text object of the report, further inputs (e.g.
+# "space" for LSA metrics) are given as keyword arguments:
+#
+#   report = MetricReport(text, ["flesch_reading_ease", "noun_incidence"])
+#   values = report.compute()
+
+import inspect
+
+from .metric import get_metric, registered_metrics
+from . import descriptives
+from . import word_information
+from . import readability
+from . import coreference
+from . import latent_semantic_analysis
+
+# Nodes of the dependency graph: name -> (function, names of dependencies).
+_nodes = {}
+
+
+def node(name = None):
+    """Decorator to register a function as node of the dependency graph.
+
+    Keyword arguments:
+    name -- Name of the node (default: name of the function).
+    """
+    def register(function):
+        node_name = name or function.__name__
+        dependencies = tuple(inspect.signature(function).parameters)
+        _nodes[node_name] = (function, dependencies)
+        return function
+    return register
+
+def available_metrics():
+    """Returns the names of all metrics that can be requested."""
+    return [metric.name for metric in registered_metrics()]
+
+
+class MetricReport(object):
+    """Computes the requested metrics of a text and shares
+    intermediate results between them.
+    """
+
+    def __init__(self, text, metrics = None, **inputs):
+        """Creates a report for the given Text object.
+
+        Keyword arguments:
+        metrics -- List of metric names or Coh-Metrix codes (default: all
+            metrics, which only need the text and the given inputs).
+        inputs -- Further inputs of the metrics, e.g. space = SemanticSpace(…).
+        """
+        self.text = text
+        self.inputs = dict(inputs)
+        if metrics is None:
+            self.metrics = [m.name for m in registered_metrics() if m.inputs() <= set(self.inputs)]
+        else:
+            self.metrics = [get_metric(key).name for key in metrics]
+        self._values = dict(self.inputs, text = text)
+
+    def plan(self, names = None):
+        """Returns the names of all nodes needed for the requested
+        metrics (or the given nodes) in the order of computation.
+        Nodes already computed are left out.
+        """
+        order = []
+        visiting = set()
+
+        def visit(name):
+            if name in order or name in self._values:
+                return
+            if name not in _nodes:
+                raise ValueError("Missing input '%s' for metric report." % name)
+            if name in visiting:
+                raise ValueError("Cyclic dependency for '%s'." % name)
+            visiting.add(name)
+            for dependency in _nodes[name][1]:
+                visit(dependency)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in (self.metrics if names is None else names):
+            visit(name)
+        return order
+
+    def compute(self):
+        """Computes the requested metrics. Returns a dictionary
+        with the values of the metrics.
+        """
+        self._evaluate(self.plan())
+        return {name: self._values[name] for name in self.metrics}
+
+    def by_code(self):
+        """Returns the computed values by Coh-Metrix code (metrics
+        without code by name).
+        """
+        values = self.compute()
+        return {(get_metric(name).code or name): value for name, value in values.items()}
+
+    def __getitem__(self, name):
+        """Returns the value of a node (metric or intermediate result),
+        computes it if necessary.
+        """
+        self._evaluate(self.plan([name]))
+        return self._values[name]
+
+    def _evaluate(self, order):
+        for name in order:
+            function, dependencies = _nodes[name]
+            self._values[name] = function(*[self._values[d] for d in dependencies])
+
+
+# Intermediate results
+# ====================
+
+@node()
+def language(text):
+    return text.language()[0]
+
+@node()
+def token_table(text):
+    return text.token_table()
+
+@node()
+def number_of_sentences(text):
+    return descriptives.number_of_sentences(text)
+
+@node()
+def number_of_words(text, token_table):
+    return descriptives.number_of_words(text, token_table)
+
+@node()
+def wordcount_total(text, token_table):
+    return word_information.wordcount_total(text, token_table)
+
+@node()
+def average_sentence_length(text, number_of_words):
+    return readability.average_sentence_length(text, number_of_words)
+
+@node()
+def average_syllables_per_word(text, number_of_words):
+    return readability.average_syllables_per_word(text, number_of_words)
+
+@node()
+def percentage_of_long_words(text, number_of_words):
+    return readability.percentage_of_long_words(text, number_of_words)
+
+@node()
+def percentage_of_polysyllabic_words(text, number_of_words):
+    return readability.percentage_of_polysyllabic_words(text, number_of_words)
+
+@node()
+def percentage_of_monosyllabic_words(text, number_of_words):
+    return readability.percentage_of_monosyllabic_words(text, number_of_words)
+
+
+# Descriptive indices
+# ===================
+
+@node()
+def number_of_paragraphs(text):
+    return descriptives.number_of_paragraphs(text)
+
+@node()
+def paragraph_length_in_sentences(text, token_table, number_of_sentences):
+    return descriptives.paragraph_length_in_sentences(text, token_table, number_of_sentences)
+
+@node()
+def sentence_length_in_words(text, token_table, number_of_words):
+    return descriptives.sentence_length_in_words(text, token_table, number_of_words)
+
+@node()
+def word_length_in_syllables(text, token_table):
+    return descriptives.word_length_in_syllables(text, token_table)
+
+@node()
+def word_length_in_characters(text, token_table):
+    return descriptives.word_length_in_characters(text, token_table)
+
+
+# Word information
+# ================
+
+def _incidence_node(name, taglist):
+    def incidence(token_table, wordcount_total):
+        return word_information.incidence(token_table.count(taglist), wordcount_total, per = 1000)
+    node(name)(incidence)
+
+for _name, _taglist in [
+        ("verb_incidence", word_information.verb_tags),
+        ("noun_incidence", word_information.noun_tags),
+        ("adjective_incidence", word_information.adjective_tags),
+        ("adverb_incidence", word_information.adverb_tags),
+        ("pronoun_incidence", word_information.pronoun_tags),
+        ("content_word_incidence", word_information.content_word_tags),
+        ("function_word_incidence", word_information.function_word_tags)]:
+    _incidence_node(_name, _taglist)
+
+def _pronoun_incidence_node(name, pronouns):
+    def incidence(token_table, wordcount_total):
+        return word_information.incidence(
+            word_information.pronoun_count(token_table, pronouns), wordcount_total, per = 1000)
+    node(name)(incidence)
+
+for _name, _pronouns in [
+        ("first_person_singular_pronoun_incidence", word_information.first_person_singular_pronouns),
+        ("first_person_plural_pronoun_incidence", word_information.first_person_plural_pronouns),
+        ("second_person_pronoun_incidence", word_information.second_person_pronouns),
+        ("third_person_singular_pronoun_incidence", word_information.third_person_singular_pronouns),
+        ("third_person_plural_pronoun_incidence", word_information.third_person_plural_pronouns)]:
+    _pronoun_incidence_node(_name, _pronouns)
+
+# Frequencies are looked up in the "frequency_lexicon" input.
+
+@node()
+def celex_word_frequency_content_words(text, frequency_lexicon):
+    return word_information.celex_word_frequency_content_words(text, frequency_lexicon)
+
+@node()
+def celex_log_frequency_all_words(text, frequency_lexicon):
+    return word_information.celex_log_frequency_all_words(text, frequency_lexicon)
+
+@node()
+def celex_min_frequency_content_words(text, frequency_lexicon):
+    return word_information.celex_min_frequency_content_words(text, frequency_lexicon)
+
+# Ratings are looked up in the "word_norms" input.
+
+@node()
+def age_acquisition_content_words(text, word_norms):
+    return word_information.age_acquisition_content_words(text, word_norms)
+
+@node()
+def familiarity_content_words(text, word_norms):
+    return word_information.familiarity_content_words(text, word_norms)
+
+@node()
+def concreteness_content_words(text, word_norms):
+    return word_information.concreteness_content_words(text, word_norms)
+
+@node()
+def imagability_content_words(text, word_norms):
+    return word_information.imagability_content_words(text, word_norms)
+
+@node()
+def meaningfulness_colorodo_content_words(text, word_norms):
+    return word_information.meaningfulness_colorodo_content_words(text, word_norms)
+
+@node()
+def polysemy_content_words(text, word_norms):
+    return word_information.polysemy_content_words(text, word_norms)
+
+# Depths of hypernymy are looked up in the "hypernym_index" input.
+
+@node()
+def hypernymy_nouns(text, hypernym_index):
+    return word_information.hypernymy_nouns(text, hypernym_index)
+
+@node()
+def hypernymy_verbs(text, hypernym_index):
+    return word_information.hypernymy_verbs(text, hypernym_index)
+
+@node()
+def hypernymy_nouns_and_verbs(text, hypernym_index):
+    return word_information.hypernymy_nouns_and_verbs(text, hypernym_index)
+
+
+# Readability
+# ===========
+
+@node()
+def lesbarkeitsindex_LIX(language, average_sentence_length, percentage_of_long_words):
+    return readability.compute_lesbarkeitsindex_LIX(
+        language, average_sentence_length, percentage_of_long_words)
+
+@node()
+def wiener_sachtextformel(language, percentage_of_polysyllabic_words, average_sentence_length,
+                          percentage_of_long_words, percentage_of_monosyllabic_words):
+    return readability.compute_wiener_sachtextformel(
+        language, percentage_of_polysyllabic_words, average_sentence_length,
+        percentage_of_long_words, percentage_of_monosyllabic_words)
+
+@node()
+def flesch_reading_ease(language, average_sentence_length, average_syllables_per_word):
+    return readability.compute_flesch_reading_ease(
+        language, average_sentence_length, average_syllables_per_word)
+
+
+# Referential cohesion
+# ====================
+
+for _function in [
+        coreference.local_noun_overlap,
+        coreference.global_noun_overlap,
+        coreference.local_argument_overlap,
+        coreference.global_argument_overlap,
+        coreference.local_stem_overlap,
+        coreference.global_stem_overlap,
+        coreference.local_content_words_overlap,
+        coreference.global_content_words_overlap]:
+    node(_function.__name__)(_function)
+
+
+# Latent Semantic Analysis
+# ========================
+
+# Sentences and paragraphs are projected once, all
+# LSA metrics use the same matrices of cosines.
+
+@node()
+def sentence_cosines(text, space):
+    return latent_semantic_analysis.sentence_cosines(text, space)
+
+@node()
+def paragraph_cosines(text, space):
+    return latent_semantic_analysis.paragraph_cosines(text, space)
+
+@node()
+def local_lsa_overlap_sentences(sentence_cosines):
+    return latent_semantic_analysis.local_cosine_statistics(sentence_cosines)
+
+@node()
+def global_lsa_overlap_sentences(sentence_cosines):
+    return latent_semantic_analysis.global_cosine_statistics(sentence_cosines)
+
+@node()
+def local_lsa_overlap_paragraphs(paragraph_cosines):
+    return latent_semantic_analysis.local_cosine_statistics(paragraph_cosines)
+
+@node()
+def global_lsa_overlap_paragraphs(paragraph_cosines):
+    return latent_semantic_analysis.global_cosine_statistics(paragraph_cosines)
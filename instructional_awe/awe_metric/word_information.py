@@ -5,10 +5,12 @@
 
 # from metrics.descriptives import Words
 import statistics
-import time
+import numpy as np
 
-from ..awe_foreign.dwds import DWDS
-from ..awe_foreign.babelnet import BabelNet
+from .metric import Metric
+from ..awe_lexica.frequency_lexicon import get_frequency_lexicon
+from ..awe_lexica import word_norms as norms_module
+from ..awe_lexica.hypernymy import get_hypernym_index
 
 # Configure Logging
 import logging, sys, os
@@ -100,11 +102,11 @@ def pos_list_for_tags(text, taglist = [], taglevel = 0):
         return [tag for tag in text.tagged_words(taglevel) if tag[3] in taglist]
 
 def wordcount_for_tags(text, taglist = []):
-    return len(pos_list_for_tags(text, taglist))
+    return text.token_table().count(taglist)
 
-def wordcount_total(text):
-    pos_list_all_words = [tag for tag in text.tagged_words(taglevel = 0) if tag not in nonword_tags]
-    return len(pos_list_all_words)
+def wordcount_total(text, token_table = None):
+    table = token_table if token_table is not None else text.token_table()
+    return len(table) - table.count(nonword_tags)
 
 def incidence_for_tags(text, taglist = [], per = 1000):
     """Returns incidence value for words in taglist for given population size.
@@ -180,210 +182,395 @@ def function_word_incidence(text):
 # Incidence Values for words / parts of speech (graduated).
 # =========================================================
 
+# Pronouns of the graduated incidences: column of the TokenTable
+# ("tokens" or "lemmas") and the matching strings.
+first_person_singular_pronouns = ("tokens", ["ich", "mich", "mir", "meiner"])
+first_person_plural_pronouns = ("lemmas", ["wir", "uns", "unser"])
+# Use explicit word (not stem or lemma).
+second_person_pronouns = ("tokens", ["du", "dich", "dir", "deiner", "Du", "Dich", "Dir", "Deiner"])
+# second_person_pronouns[1] += ["ihr", "euch", "euer", "eu", "Ihr", "Euch", "Euer", "Eu"]
+third_person_singular_pronouns = ("tokens", ["er", "sie", "es", "ihn", "ihm", "seiner", "ihrer"])
+third_person_plural_pronouns = ("tokens", ["sie","Sie", "ihnen", "Ihnen", "ihrer", "Ihrer"])
+
+def pronoun_count(table, pronouns):
+    """Returns the number of pronouns of the TokenTable matching the
+    given pair (column, strings).
+    """
+    column, matching_list = pronouns
+    mask = table.token_mask(matching_list) if column == "tokens" else table.lemma_mask(matching_list)
+    return int(np.count_nonzero(table.pos_mask(pronoun_tags) & mask))
+
 def first_person_singular_pronoun_incidence(text):
     """Returns the relative frequency of the given word category by
     counting the number of instances of the category per 1000 words
     of text.
     """
-    taglist = pronoun_tags
-    pos_list = pos_list_for_tags(text, taglist, taglevel = 1)
-    matching_list = ["ich", "mich", "mir", "meiner"]
-    count = len([tag for tag in pos_list if tag[0] in matching_list])
-    population = wordcount_total(text)
-    return incidence(count, population, per = 1000)
+    count = pronoun_count(text.token_table(), first_person_singular_pronouns)
+    return incidence(count, wordcount_total(text), per = 1000)
 
 def first_person_plural_pronoun_incidence(text):
     """Returns the relative frequency of the given word category by
     counting the number of instances of the category per 1000 words
     of text.
     """
-    taglist = pronoun_tags
-    pos_list = pos_list_for_tags(text, taglist, taglevel = 1)
-    matching_list = ["wir", "uns", "unser"]
-    count = len([tag for tag in pos_list if tag[1] in matching_list])
-    population = wordcount_total(text)
-    return incidence(count, population, per = 1000)
+    count = pronoun_count(text.token_table(), first_person_plural_pronouns)
+    return incidence(count, wordcount_total(text), per = 1000)
 
 def second_person_pronoun_incidence(text):
     """Returns the relative frequency of the given word category by
     counting the number of instances of the category per 1000 words
     of text.
     """
-    taglist = pronoun_tags
-    pos_list = pos_list_for_tags(text, taglist, taglevel = 1)
-    # Use explicit word (not stem or lemma).
-    matching_list = ["du", "dich", "dir", "deiner", "Du", "Dich", "Dir", "Deiner"]
-    # matching_list += ["ihr", "euch", "euer", "eu", "Ihr", "Euch", "Euer", "Eu"]
-    count = len([tag for tag in pos_list if tag[0] in matching_list])
-    population = wordcount_total(text)
-    return incidence(count, population, per = 1000)
+    count = pronoun_count(text.token_table(), second_person_pronouns)
+    return incidence(count, wordcount_total(text), per = 1000)
 
 def third_person_singular_pronoun_incidence(text):
     """Returns the relative frequency of the given word category by
     counting the number of instances of the category per 1000 words
     of text.
     """
-    taglist = pronoun_tags
-    pos_list = pos_list_for_tags(text, taglist, taglevel = 1)
-    # Use explicit word (not stem or lemma).
-    matching_list = ["er", "sie", "es", "ihn", "ihm", "seiner", "ihrer"]
-    count = len([tag for tag in pos_list if tag[0] in matching_list])
-    population = wordcount_total(text)
-    return incidence(count, population, per = 1000)
+    count = pronoun_count(text.token_table(), third_person_singular_pronouns)
+    return incidence(count, wordcount_total(text), per = 1000)
 
 def third_person_plural_pronoun_incidence(text):
     """Returns the relative frequency of the given word category by
     counting the number of instances of the category per 1000 words
     of text.
     """
-    taglist = pronoun_tags
-    pos_list = pos_list_for_tags(text, taglist, taglevel = 1)
-    # Use explicit word (not stem or lemma).
-    matching_list = ["sie","Sie", "ihnen", "Ihnen", "ihrer", "Ihrer"]
-    count = len([tag for tag in pos_list if tag[0] in matching_list])
-    population = wordcount_total(text)
-    return incidence(count, population, per = 1000)
+    count = pronoun_count(text.token_table(), third_person_plural_pronouns)
+    return incidence(count, wordcount_total(text), per = 1000)
 
 # Word Frequency
 # ==============
 
-def celex_word_frequency_content_words(text):
-    """Returns the mean word frequency for content words.
+#   Frequencies are looked up in a local frequency lexicon (see
+#   awe_lexica/frequency_lexicon.py), all words of a text at once.
+
+def word_frequencies(words, lexicon = None):
+    """Returns the entries {'hits', 'total', 'frequency'} of the
+    given words from the frequency lexicon (default: process-wide lexicon).
+    """
+    if lexicon is None:
+        lexicon = get_frequency_lexicon()
+    entries = lexicon.get_frequencies(words)
+    return [entries[word] for word in words]
+
+def celex_word_frequency_content_words(text, lexicon = None):
+    """Returns the mean word frequency (per million words) for content words.
 
     Coc-Metrix uses CELEX. We are using DWDS.
     """
-    content_words = pos_list_for_tags(text, taglist = content_word_tags, taglevel = 1)
-    content_words = [tag[0] for tag in content_words]
-    dw = DWDS()
-    freqs = list()
-    logger.debug("Starting requests for DWDS")
-    for word in content_words:
-        logger.debug("Get frequency from DWDS for '%s'" % word)
-        r = dw.get_frequency(word)
-        freq = (int(r['hits']) / int(r['total'])) * 1000000
-        freqs.append(freq)
-        time.sleep(0.2)
+    table = text.token_table()
+    content_words = table.column("tokens", table.pos_mask(content_word_tags))
+    freqs = [(int(r['hits']) / int(r['total'])) * 1000000
+             for r in word_frequencies(content_words, lexicon)]
     return statistics.mean(freqs)
 
-def celex_log_frequency_all_words(text):
+def celex_log_frequency_all_words(text, lexicon = None):
     """Returns the mean of the logarithms of word frequency for all words.
 
     Coc-Metrix uses CELEX. We are using DWDS.
     """
-    all_words = [tag for tag in text.tagged_words(taglevel = 1) if tag not in nonword_tags]
-    all_words = [tag[0] for tag in all_words]
-    dw = DWDS()
-    logs = list()
-    logger.debug("Starting requests for DWDS")
-    for word in all_words:
-        logger.debug("Get frequency from DWDS for '%s'" % word)
-        r = dw.get_frequency(word)
-        log = float(r['frequency'])
-        logs.append(log)
-        time.sleep(0.2)
+    table = text.token_table()
+    all_words = table.column("tokens", table.word_mask())
+    logs = [float(r['frequency']) for r in word_frequencies(all_words, lexicon)]
     return statistics.mean(logs)
 
-def celex_min_frequency_content_words(text):
+def celex_min_frequency_content_words(text, lexicon = None):
     """Returns the average minimum logarithmic
     frequency for content words across sentences.
 
     Coh-Metrixs uses CELEX. We are usung DWDS.
     """
-    dw = DWDS()
-    mins = list()
-    for sentence in text.tagged_sentences():
-        content_words = [tag[0] for tag in sentence if tag in content_word_tags]
-        freqs = list()
-        for word in content_words:
-            logger.debug("Get frequency from DWDS for '%s'" % word)
-            r = dw.get_frequency(word)
-            log = float(r['frequency'])
-            freqs.append(log)
-            time.sleep(0.2)
-        # Collect smallest frequency of function word in sentence, if list is not empty.
-        if freqs:
-            mins.append(min(freqs))
-
-    return statistics.mean(mins)
+    table = text.token_table()
+    mask = table.pos_mask(content_word_tags)
+    logs = np.array([float(r['frequency'])
+                     for r in word_frequencies(table.column("tokens", mask), lexicon)])
+    # Smallest frequency of content words per sentence,
+    # for sentences with content words.
+    mins = np.full(table.number_of_sentences, np.inf)
+    np.minimum.at(mins, table.sentence_index[mask], logs)
+    return statistics.mean(mins[np.isfinite(mins)].tolist())
 
 # Psychological Ratings
 # =====================
 
-def age_acquisition_content_words(text):
-    """
-    """
-    # TODO
-    raise NotImplementedError
+#   Ratings are looked up in a local word norm store (see
+#   awe_lexica/word_norms.py) by the lemmas of the content words.
+#   Every distinct lemma of a text is looked up once. Content words
+#   without rating are skipped by default (missing = "skip"); the
+#   result is NaN, if no content word has a rating.
 
-def familiarity_content_words(text):
-    """
-    """
-    # TODO
-    raise NotImplementedError
+def content_word_norm(text, column, norms = None, missing = "skip"):
+    """Returns the mean of the given norm for the content words.
 
-def concreteness_content_words(text):
+    Keyword arguments:
+    norms -- WordNormStore (default: process-wide store).
+    missing -- Policy for words without value: "skip", "zero",
+        "mean" or a number (default "skip").
     """
+    if norms is None:
+        norms = norms_module.get_word_norms()
+    table = text.token_table()
+    mask = table.pos_mask(content_word_tags)
+    values = norms.lookup(table.lemmas, column)[table.lemma_ids[mask]]
+    return norms.aggregate(values, column, missing)
+
+def age_acquisition_content_words(text, norms = None, missing = "skip"):
+    """Returns the mean age of acquisition rating for content words.
     """
-    # TODO
-    raise NotImplementedError
+    return content_word_norm(text, norms_module.AGE_OF_ACQUISITION, norms, missing)
 
-def imagability_content_words(text):
+def familiarity_content_words(text, norms = None, missing = "skip"):
+    """Returns the mean familiarity rating for content words.
     """
+    return content_word_norm(text, norms_module.FAMILIARITY, norms, missing)
+
+def concreteness_content_words(text, norms = None, missing = "skip"):
+    """Returns the mean concreteness rating for content words.
+
+    Coh-Metrix uses the MRC database. We are using e.g. the
+    predictions of Charbonnier & Wartena (2020).
     """
-    # TODO
-    raise NotImplementedError
+    return content_word_norm(text, norms_module.CONCRETENESS, norms, missing)
 
-def meaningfulness_colorodo_content_words(text):
+def imagability_content_words(text, norms = None, missing = "skip"):
+    """Returns the mean imageability rating for content words.
     """
+    return content_word_norm(text, norms_module.IMAGEABILITY, norms, missing)
+
+def meaningfulness_colorodo_content_words(text, norms = None, missing = "skip"):
+    """Returns the mean meaningfulness rating for content words.
+
+    Coh-Metrix uses the Colorado norms.
     """
-    # TODO
-    raise NotImplementedError
+    return content_word_norm(text, norms_module.MEANINGFULNESS, norms, missing)
 
 
-# Psychological Ratings
-# =====================
+# Polysemy and Hypernymy
+# ======================
 
-def polysemy_content_words(text):
-    """
+def polysemy_content_words(text, norms = None, missing = "skip"):
+    """Returns the mean polysemy (number of senses) for content words.
+
+    Coh-Metrix uses WordNet. The number of senses has to be provided
+    as norm "polysemy" of the word norm store.
     """
-    # TODO
-    raise NotImplementedError
+    return content_word_norm(text, norms_module.POLYSEMY, norms, missing)
 
-def hypernymy_nouns(text):
-    """Provides estimates of hypernymy for nouns in the text.
+#   Depths of hypernymy are looked up in an offline hypernym index (see
+#   awe_lexica/hypernymy.py) by the lemmas of nouns and verbs. Words not
+#   in the index are skipped; the result is NaN, if no word is found.
 
-    A hypernym is denotes a supertype in semantic relationships.
+def hypernymy_depths(text, parts, index = None, kind = "mean"):
+    """Returns array with the depths of hypernymy of the words of the
+    given parts of speech ("noun", "verb") in the index.
+
+    Keyword arguments:
+    index -- HypernymIndex (default: process-wide index).
+    kind -- Depth of words with several hypernyms, "min" or "mean" (default "mean").
     """
-    nouns = pos_list_for_tags(text, taglist = noun_tags, taglevel = 1)
-    nouns = [tag[1] for tag in nouns]
+    if index is None:
+        index = get_hypernym_index()
+    table = text.token_table()
+    lemmas = table.lemmas.tolist()
+    depths = list()
+    for part in parts:
+        mask = table.pos_mask(noun_tags if part == "noun" else verb_tags)
+        depths.append(index.lookup(lemmas, part, kind)[table.lemma_ids[mask]])
+    depths = np.concatenate(depths)
+    return depths[~np.isnan(depths)]
 
-    from wiktionaryparser import WiktionaryParser
-    parser = WiktionaryParser()
-    parser.url = "https://de.wiktionary.org/wiki/{}?printable=yes"
-    parser.set_default_language("german")
-    parser.include_part_of_speech("noun")
-    parser.include_relation("hypernyms")
+def _mean_or_nan(values):
+    return float(values.mean()) if len(values) else float("nan")
 
-    #for noun in nouns:
-    noun = nouns[0]
-    results = parser.fetch(noun)
-    for result in results:
-        #     for definition in result["definitions"]:
-        #         hypernyms = [ hy["words"] for hy in definition["relatedWords"] if hy["relationshipType"] == "hypernyms" ]
-        print(noun, ":", result)
+def hypernymy_nouns(text, index = None, kind = "mean"):
+    """Provides estimates of hypernymy for nouns in the text.
 
+    A hypernym is denotes a supertype in semantic relationships.
+    """
+    return _mean_or_nan(hypernymy_depths(text, ["noun"], index, kind))
 
-def hypernymy_verbs(text):
+def hypernymy_verbs(text, index = None, kind = "mean"):
     """Provides estimates of hypernymy for verbs in the text.
     A hypernym is denotes a supertype in semantic relationships.
     """
-    # TODO
-    raise NotImplementedError
+    return _mean_or_nan(hypernymy_depths(text, ["verb"], index, kind))
 
-def hypernymy_nouns_and_verbs(text):
+def hypernymy_nouns_and_verbs(text, index = None, kind = "mean"):
     """Provides estimates of hypernymy for nouns and verbs in the text.
     A hypernym is denotes a supertype in semantic relationships.
     """
-    # TODO
-    raise NotImplementedError
-
+    return _mean_or_nan(hypernymy_depths(text, ["noun", "verb"], index, kind))
+
+
+# Metrics
+# =======
+
+class NounIncidence(Metric):
+    name = "noun_incidence"
+    code = "WRDNOUN"
+    description = "Noun incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class VerbIncidence(Metric):
+    name = "verb_incidence"
+    code = "WRDVERB"
+    description = "Verb incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class AdjectiveIncidence(Metric):
+    name = "adjective_incidence"
+    code = "WRDADJ"
+    description = "Adjective incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class AdverbIncidence(Metric):
+    name = "adverb_incidence"
+    code = "WRDADV"
+    description = "Adverb incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class PronounIncidence(Metric):
+    name = "pronoun_incidence"
+    code = "WRDPRO"
+    description = "Pronoun incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class ContentWordIncidence(Metric):
+    name = "content_word_incidence"
+    code = None
+    description = "Content word incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class FunctionWordIncidence(Metric):
+    name = "function_word_incidence"
+    code = None
+    description = "Function word incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class FirstPersonSingularPronounIncidence(Metric):
+    name = "first_person_singular_pronoun_incidence"
+    code = "WRDPRP1s"
+    description = "First person singular pronoun incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class FirstPersonPluralPronounIncidence(Metric):
+    name = "first_person_plural_pronoun_incidence"
+    code = "WRDPRP1p"
+    description = "First person plural pronoun incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class SecondPersonPronounIncidence(Metric):
+    name = "second_person_pronoun_incidence"
+    code = "WRDPRP2"
+    description = "Second person pronoun incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class ThirdPersonSingularPronounIncidence(Metric):
+    name = "third_person_singular_pronoun_incidence"
+    code = "WRDPRP3s"
+    description = "Third person singular pronoun incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class ThirdPersonPluralPronounIncidence(Metric):
+    name = "third_person_plural_pronoun_incidence"
+    code = "WRDPRP3p"
+    description = "Third person plural pronoun incidence"
+    requires = ("token_table",)
+    taglevels = (1,)
+
+class WordFrequencyContentWords(Metric):
+    name = "celex_word_frequency_content_words"
+    code = "WRDFRQc"
+    description = "Word frequency for content words, mean"
+    requires = ("token_table", "frequency_lexicon")
+    taglevels = (1,)
+
+class LogFrequencyAllWords(Metric):
+    name = "celex_log_frequency_all_words"
+    code = "WRDFRQa"
+    description = "Log frequency for all words, mean"
+    requires = ("token_table", "frequency_lexicon")
+    taglevels = (1,)
+
+class MinFrequencyContentWords(Metric):
+    name = "celex_min_frequency_content_words"
+    code = "WRDFRQmc"
+    description = "Log minimum frequency for content words, mean"
+    requires = ("token_table", "frequency_lexicon")
+    taglevels = (1,)
+
+class AgeOfAcquisitionContentWords(Metric):
+    name = "age_acquisition_content_words"
+    code = "WRDAOAc"
+    description = "Age of acquisition for content words, mean"
+    requires = ("token_table", "word_norms")
+    taglevels = (1,)
+
+class FamiliarityContentWords(Metric):
+    name = "familiarity_content_words"
+    code = "WRDFAMc"
+    description = "Familiarity for content words, mean"
+    requires = ("token_table", "word_norms")
+    taglevels = (1,)
+
+class ConcretenessContentWords(Metric):
+    name = "concreteness_content_words"
+    code = "WRDCNCc"
+    description = "Concreteness for content words, mean"
+    requires = ("token_table", "word_norms")
+    taglevels = (1,)
+
+class ImagabilityContentWords(Metric):
+    name = "imagability_content_words"
+    code = "WRDIMGc"
+    description = "Imagability for content words, mean"
+    requires = ("token_table", "word_norms")
+    taglevels = (1,)
+
+class MeaningfulnessContentWords(Metric):
+    name = "meaningfulness_colorodo_content_words"
+    code = "WRDMEAc"
+    description = "Meaningfulness, Colorado norms, content words, mean"
+    requires = ("token_table", "word_norms")
+    taglevels = (1,)
+
+class PolysemyContentWords(Metric):
+    name = "polysemy_content_words"
+    code = "WRDPOLc"
+    description = "Polysemy for content words, mean"
+    requires = ("token_table", "word_norms")
+    taglevels = (1,)
+
+class HypernymyNouns(Metric):
+    name = "hypernymy_nouns"
+    code = "WRDHYPn"
+    description = "Hypernymy for nouns, mean"
+    requires = ("token_table", "hypernym_index")
+    taglevels = (1,)
+
+class HypernymyVerbs(Metric):
+    name = "hypernymy_verbs"
+    code = "WRDHYPv"
+    description = "Hypernymy for verbs, mean"
+    requires = ("token_table", "hypernym_index")
+    taglevels = (1,)
+
+class HypernymyNounsAndVerbs(Metric):
+    name = "hypernymy_nouns_and_verbs"
+    code = "WRDHYPnv"
+    description = "Hypernymy for nouns and verbs, mean"
+    requires = ("token_table", "hypernym_index")
+    taglevels = (1,)
@@ -0,0 +1,173 @@
+# document_index.py - Nearest neighbour search over the documents of a semantic space.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# The documents of a semantic space are rows of normalized vectors, the
+# cosine of a query and a document is their dot product.
+#
+# exact_search() computes the dot products block by block and keeps the
+# k best documents of every block, so memory does not grow with the
+# number of documents.
+#
+# RandomProjectionIndex is a locality sensitive hash (random hyperplanes):
+# every table hashes a vector to the signs of its dot products with n_bits
+# random hyperplanes. Vectors with a small angle fall into the same bucket
+# with high probability. A query collects the documents of its buckets
+# (and of the buckets differing in one bit) in all tables and ranks these
+# candidates exactly. Buckets are stored as sorted arrays, no Python
+# objects per document.
+#
+# If these buckets hold less than k documents, further buckets are probed
+# (multi-probe LSH): the buckets reached by flipping several of the bits
+# with the smallest margins (dot products close to 0, i.e. the query lies
+# close to the hyperplane), in order of the summed margins. Only if this
+# still gives less than k documents and the caller asks for it, all
+# documents are searched exactly.
+
+import numpy as np
+
+
+def exact_search(documents, queries, k = 10, block_size = 65536):
+    """Returns the indices and cosines of the k most similar documents
+    for every query (rows of normalized vectors), most similar first.
+
+    Keyword arguments:
+    k -- Number of documents per query (default 10).
+    block_size -- Number of documents compared at once (default 65536).
+    """
+    queries = np.atleast_2d(queries)
+    k = min(k, len(documents))
+    best_indices = np.empty((len(queries), 0), dtype = np.int64)
+    best_cosines = np.empty((len(queries), 0), dtype = queries.dtype)
+    for start in range(0, len(documents), block_size):
+        block = np.asarray(documents[start:start + block_size])
+        block_indices = np.broadcast_to(np.arange(start, start + len(block)), (len(queries), len(block)))
+        # Merge the best documents so far with the documents of this block.
+        cosines = np.hstack([best_cosines, queries @ block.T])
+        indices = np.hstack([best_indices, block_indices])
+        if cosines.shape[1] > k:
+            top = np.argpartition(-cosines, k - 1, axis = 1)[:, :k]
+            cosines = np.take_along_axis(cosines, top, axis = 1)
+            indices = np.take_along_axis(indices, top, axis = 1)
+        best_cosines, best_indices = cosines, indices
+    order = np.argsort(-best_cosines, axis = 1)
+    return np.take_along_axis(best_indices, order, axis = 1), np.take_along_axis(best_cosines, order, axis = 1)
+
+
+class RandomProjectionIndex(object):
+    """Approximate nearest neighbour index over normalized document
+    vectors using random hyperplane hashing.
+    """
+
+    def __init__(self, documents, n_tables = 8, n_bits = 12, random_state = 0):
+        """Builds the index for the given documents (rows of normalized vectors).
+
+        Keyword arguments:
+        n_tables -- Number of hash tables (default 8).
+        n_bits -- Number of hyperplanes per table (default 12).
+        random_state -- Seed of the random hyperplanes (default 0).
+        """
+        self.documents = documents
+        self.n_bits = n_bits
+        rng = np.random.default_rng(random_state)
+        self.planes = rng.standard_normal((n_tables, n_bits, documents.shape[1]))
+        self._weights = 1 << np.arange(n_bits, dtype = np.int64)
+        # Per table: document indices sorted by hash code, and the sorted codes.
+        self._order = []
+        self._codes = []
+        for table in range(n_tables):
+            codes = self._hash(np.asarray(documents), table)
+            order = np.argsort(codes, kind = 'stable')
+            self._order.append(order)
+            self._codes.append(codes[order])
+
+    # Number of low-margin bits combined for further probes.
+    probe_bits = 8
+
+    def _hash(self, vectors, table):
+        return ((vectors @ self.planes[table].T) > 0) @ self._weights
+
+    def _bucket(self, table, code):
+        codes = self._codes[table]
+        start = np.searchsorted(codes, code, side = 'left')
+        stop = np.searchsorted(codes, code, side = 'right')
+        return self._order[table][start:stop]
+
+    def _extra_probes(self, projections):
+        # Codes to xor with the code of the query, flipping two or more
+        # of the bits with the smallest margins, most promising first.
+        margins = np.abs(projections)
+        bits = np.argsort(margins)[:min(self.probe_bits, self.n_bits)]
+        # All subsets of these bits as rows of 0/1, with two bits or more.
+        subsets = np.arange(1, 1 << len(bits), dtype = np.int64)
+        members = (subsets[:, None] >> np.arange(len(bits))) & 1
+        members = members[members.sum(axis = 1) >= 2]
+        scores = members @ margins[bits]
+        return members[np.argsort(scores, kind = 'stable')] @ self._weights[bits]
+
+    def candidates(self, query, min_candidates = 0, max_probes = 64):
+        """Returns the indices of documents sharing a bucket
+        (or a bucket differing in one bit) with the query.
+
+        Keyword arguments:
+        min_candidates -- Probe further buckets per table, until there are
+            at least min_candidates documents (default 0).
+        max_probes -- Maximum number of further buckets per table (default 64).
+        """
+        query = np.asarray(query).reshape(1, -1)
+        # Probe the bucket of the query and its neighbouring buckets.
+        flips = np.concatenate([[0], 1 << np.arange(self.n_bits, dtype = np.int64)])
+        found = []
+        extra = []
+        for table in range(len(self.planes)):
+            projections = (query @ self.planes[table].T)[0]
+            code = int((projections > 0) @ self._weights)
+            for flip in flips:
+                found.append(self._bucket(table, code ^ flip))
+            if min_candidates:
+                extra.append((table, code, self._extra_probes(projections)[:max_probes]))
+        candidates = np.unique(np.concatenate(found)) if found else np.empty(0, dtype = np.int64)
+        # Probe further buckets of all tables in rounds, until
+        # there are enough candidates.
+        rounds = max([len(probes) for _, _, probes in extra], default = 0)
+        for start in range(0, rounds, 4):
+            if len(candidates) >= min_candidates:
+                break
+            for table, code, probes in extra:
+                for flip in probes[start:start + 4]:
+                    found.append(self._bucket(table, code ^ int(flip)))
+            candidates = np.unique(np.concatenate(found))
+        return candidates.astype(np.int64)
+
+    def search(self, query, k = 10, fallback = False):
+        """Returns the indices and cosines of the (approximately) k most
+        similar documents for the query, most similar first. If the probed
+        buckets contain less than k documents, less documents are returned.
+
+        Keyword arguments:
+        k -- Number of documents (default 10).
+        fallback -- Search all documents, if the buckets contain less
+            than k documents (default False).
+        """
+        k = min(k, len(self.documents))
+        candidates = self.candidates(query, min_candidates = k)
+        if len(candidates) < k and fallback:
+            indices, cosines = exact_search(self.documents, query, k)
+            return indices[0], cosines[0]
+        cosines = np.asarray(self.documents[candidates]) @ np.asarray(query).ravel()
+        if len(candidates) > k:
+            top = np.argpartition(-cosines, k - 1)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-cosines[top])]
+        return candidates[top], cosines[top]
@@ -5,11 +5,17 @@
 # import codecs
 import os
 import inspect
+import json
 import re
+import sys
+from collections import deque
+import multiprocessing
+import multiprocessing.util
 
 # Math Libraries
 import pandas as pd
 import numpy as np
+import scipy.sparse
 
 # Libraries for Natural Language Processing
 # and Latent Semantic Analysis
@@ -17,11 +23,16 @@ import nltk
 from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfTransformer
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.preprocessing import Normalizer
+from sklearn.preprocessing import Normalizer, normalize
 from sklearn.metrics.pairwise import cosine_similarity
 
 # Text Class from this Project
-from ..awe_text_representation.text import Text
+from ..awe_text_representation.text import Text, tag_corpus
+from ..awe_text_representation.tagger import preload_taggers
+from ..awe_text_representation.tag_cache import get_tag_cache
+
+# Nearest neighbour search over the documents of the space.
+from .document_index import exact_search, RandomProjectionIndex
 
 # Libraries to handle Stopwords
 #   from HanTa import HanoverTagger as ht
@@ -34,6 +45,34 @@ LOGLEVEL = os.environ.get('LOGLEVEL', 'WARNING').upper()
 logging.basicConfig(level=LOGLEVEL)
 logger = logging.getLogger(__name__)
 
+# On-disk format of fitted semantic spaces, see SemanticSpace.save().
+SPACE_FORMAT = "instructional_awe.semantic_space"
+SPACE_FORMAT_VERSION = 1
+
+
+def lemmatize_documents(texts):
+    """Returns the documents (paragraphs) of the given Text objects as
+    list of strings of lemmas. Texts are tagged in one pass.
+    """
+    documents = list()
+    # Every paragraph is a document. The paragraphs are
+    # views sharing the tags of their text.
+    for text in tag_corpus(texts, taglevel = 1):
+        for j in range(len(text.paragraphs)):
+            paragraph = text.paragraph_view(j)
+            # Keine Satzzeichen.
+            lemmas = [lemma for lemma in paragraph.lemmatized_words() if lemma != "--"]
+            documents.append(" ".join(lemmas))
+    # Workers of a pool do not run atexit handlers.
+    get_tag_cache().flush()
+    return documents
+
+def _init_lemmatize_worker(languages):
+    # Initializer of pool workers: load the taggers once and flush the
+    # tag cache when the worker exits.
+    preload_taggers(languages)
+    multiprocessing.util.Finalize(None, get_tag_cache().flush, exitpriority = 10)
+
 class SemanticSpace:
     """Abstract class for construction of semantic spaces.
 
@@ -46,8 +85,25 @@ class SemanticSpace:
     # Must be strictly less than the number of features.
     # The default value is useful for visualisation.
     # For LSA, a value of 100 is recommended.“
+    # The random state seeds the randomized SVD, so that
+    # fitting the same corpus gives the same space.
+    # The corpus is lemmatized in chunks of chunksize texts,
+    # by n_jobs worker processes, if n_jobs > 1.
+    # Documents added later are folded into the fitted space; the
+    # SVD is fitted again, when the share of folded-in documents
+    # exceeds the refit threshold.
+    # The dtype of tf-idf matrix, document vectors and components
+    # can be set to "float32" to halve their memory.
     _config = {
-        "n_components": 4
+        "n_components": 4,
+        "random_state": 0,
+        "chunksize": 100,
+        "n_jobs": 1,
+        "refit_threshold": 0.2,
+        "exact_search_limit": 50000,
+        "index_tables": 8,
+        "index_bits": 12,
+        "dtype": "float64"
     }
 
     # Handle path for corpora files.
@@ -75,7 +131,9 @@ class SemanticSpace:
         """
         logger.debug("Initializing new corpus object.")
 
-        # Override standard configuration.
+        # Override standard configuration. Every instance
+        # has its own copy of the configuration.
+        self._config = dict(self._config)
         if conf:
             for key in conf.keys():
                 self._config[key] = conf[key]
@@ -84,31 +142,279 @@ class SemanticSpace:
         logger.debug("Compute document-term-matrix (DTM).")
         self.dtm, self.vocabulary, self.vectorizer = self.build_dtm()
         logger.debug("Compute term-frequency-inverse-document-frequency-matrix (tf-idf).")
-        self.tfidf_dtm = self.build_tfidf()
+        self.tfidf_dtm, self.tfidf_transformer = self.build_tfidf()
         logger.debug("Building semantic spaces with %s components." % self._config["n_components"])
-        self.lsa = self.build_tfidf_lsa()
-        self.svd = self.build_tfidf_svd()
+        self.svd, self.lsa = self.build_tfidf_lsa()
+        self._fitted_documents = self.dtm.shape[0]
         logger.debug("Initialization complete.")
 
 
+    # Persistence Methods
+    #   A fitted space is stored as directory:
+    #     meta.json        -- format, version, class and configuration
+    #     vocabulary.npy   -- terms of the document-term-matrix
+    #     idf.npy          -- idf weights of the terms
+    #     svd_*.npy        -- components and singular values of the SVD
+    #     lsa.npy          -- normalized documents in the semantic space
+    #     dtm.npz          -- sparse document-term-matrix
+    #   Dense arrays are memory-mapped on loading, so worker processes
+    #   share one copy of the pages instead of fitting the space again.
+
+    _svd_attributes = ("components_", "singular_values_", "explained_variance_", "explained_variance_ratio_")
+
+    def save(self, path):
+        """Stores the fitted semantic space in the directory path.
+        The directory is created, if necessary.
+        """
+        os.makedirs(path, exist_ok = True)
+        np.save(os.path.join(path, "vocabulary.npy"), np.asarray(self.vocabulary, dtype = str))
+        np.save(os.path.join(path, "idf.npy"), self.tfidf_transformer.idf_)
+        for name in self._svd_attributes:
+            np.save(os.path.join(path, "svd_%s.npy" % name.rstrip("_")), getattr(self.svd, name))
+        np.save(os.path.join(path, "lsa.npy"), self.lsa)
+        scipy.sparse.save_npz(os.path.join(path, "dtm.npz"), self.dtm)
+        # Write meta data last: a directory without meta.json is incomplete.
+        meta = {
+            "format": SPACE_FORMAT,
+            "version": SPACE_FORMAT_VERSION,
+            "class": type(self).__name__,
+            "config": self._config,
+            "fitted_documents": self._fitted_documents,
+        }
+        with open(os.path.join(path, "meta.json"), "w", encoding = "utf-8") as meta_file:
+            json.dump(meta, meta_file, indent = 2)
+
+    @classmethod
+    def load(cls, path, mmap_mode = 'r', matrices = True):
+        """Loads a semantic space stored with save() from the directory path.
+        The corpus is neither read nor lemmatized again.
+
+        Keyword arguments:
+        mmap_mode -- Memory-map mode of the dense arrays, see numpy.load()
+            (default 'r', None loads the arrays into memory).
+        matrices -- Load the document-term-matrix and the tf-idf matrix of
+            the corpus. Not needed for projecting texts (default True).
+        """
+        with open(os.path.join(path, "meta.json"), encoding = "utf-8") as meta_file:
+            meta = json.load(meta_file)
+        if meta.get("format") != SPACE_FORMAT or meta.get("version") != SPACE_FORMAT_VERSION:
+            raise ValueError("Unsupported semantic space format in '%s'." % path)
+
+        def load_array(name):
+            return np.load(os.path.join(path, name + ".npy"), mmap_mode = mmap_mode)
+
+        names = ["idf", "lsa"] + ["svd_%s" % name.rstrip("_") for name in cls._svd_attributes]
+        space = cls.from_arrays(meta["config"], load_array("vocabulary"),
+                                {name: load_array(name) for name in names},
+                                meta.get("fitted_documents"))
+        if matrices:
+            space.dtm = scipy.sparse.load_npz(os.path.join(path, "dtm.npz"))
+            space.tfidf_dtm = space.tfidf_transformer.transform(space.dtm)
+        logger.debug("Loaded semantic space from %s." % path)
+        return space
+
+    @classmethod
+    def from_arrays(cls, config, vocabulary, arrays, fitted_documents = None):
+        """Restores a fitted space from its arrays without reading the corpus.
+        The arrays are used as given (not copied). Document-term-matrix and
+        tf-idf matrix are not restored (None).
+
+        Keyword arguments:
+        config -- Configuration of the space.
+        vocabulary -- Terms of the space, sequence of strings.
+        arrays -- Dictionary with the arrays "idf", "lsa" and "svd_components",
+            "svd_singular_values", "svd_explained_variance", "svd_explained_variance_ratio".
+        fitted_documents -- Number of documents of the last SVD fit (default: all documents).
+        """
+        space = cls.__new__(cls)
+        space._config = dict(cls._config, **config)
+        space.vocabulary = vocabulary
+        space.vectorizer = CountVectorizer(min_df=1, vocabulary = vocabulary)
+        space.tfidf_transformer = TfidfTransformer()
+        space.tfidf_transformer.idf_ = arrays["idf"]
+        space.tfidf_transformer.n_features_in_ = len(vocabulary)
+        space.svd = TruncatedSVD(space._config["n_components"], algorithm='randomized',
+                                 random_state = space._config["random_state"])
+        for name in cls._svd_attributes:
+            setattr(space.svd, name, arrays["svd_%s" % name.rstrip("_")])
+        space.svd.n_features_in_ = len(vocabulary)
+        space.lsa = arrays["lsa"]
+        space._fitted_documents = len(space.lsa) if fitted_documents is None else fitted_documents
+        space.dtm = space.tfidf_dtm = None
+        return space
+
+
+    # Methods for extending the corpus
+    #   Added documents extend vocabulary, DTM and tf-idf matrix. The SVD
+    #   is not fitted again; instead new terms are folded into the fitted
+    #   space (LSA fold-in): with X ≈ U Σ V^T, the vector of a term with
+    #   tf-idf column x is v = x^T U Σ^-1. Documents are projected with
+    #   the extended term vectors. Once the share of folded-in documents
+    #   passes refit_threshold, the SVD is fitted on the whole DTM.
+
+    def add_documents(self, texts):
+        """Adds the paragraphs of the given Text objects as documents
+        to the corpus of the space. Returns the number of added documents.
+        """
+        if self.dtm is None:
+            raise ValueError("Semantic space was loaded without document-term-matrix.")
+        documents = lemmatize_documents(list(texts))
+
+        # Count terms of the new documents. Unknown
+        # terms are appended to the vocabulary.
+        analyzer = self.analyzer()
+        term_index = dict(self.term_index())
+        new_terms = list()
+        indptr = [0]
+        indices = []
+        for document in documents:
+            for term in analyzer(document):
+                column = term_index.get(term)
+                if column is None:
+                    column = term_index[term] = len(term_index)
+                    new_terms.append(term)
+                indices.append(column)
+            indptr.append(len(indices))
+        counts = scipy.sparse.csr_matrix(
+            (np.ones(len(indices), dtype = self.dtm.dtype), indices, indptr),
+            shape = (len(documents), len(term_index)))
+        counts.sum_duplicates()
+
+        # Extend vocabulary and DTM, compute tf-idf weights again.
+        n_terms = self.dtm.shape[1]
+        dtm = scipy.sparse.csr_matrix(self.dtm)
+        dtm.resize((dtm.shape[0], len(term_index)))
+        self.dtm = scipy.sparse.vstack([dtm, counts], format = "csr")
+        self.vocabulary = np.concatenate([np.asarray(self.vocabulary, dtype = object),
+                                          np.array(new_terms, dtype = object)])
+        self.vectorizer = CountVectorizer(min_df=1, vocabulary = self.vocabulary)
+        self._term_index = term_index
+        self.tfidf_dtm, self.tfidf_transformer = self.build_tfidf()
+
+        if self.drift() > self._config["refit_threshold"]:
+            logger.debug("Drift %.2f exceeds refit threshold, fitting SVD again." % self.drift())
+            self.refit()
+        else:
+            self._fold_in_terms(n_terms)
+        return len(documents)
+
+    def drift(self):
+        """Returns the share of documents folded into the space
+        since the last fit of the SVD.
+        """
+        return 1 - self._fitted_documents / self.dtm.shape[0]
+
+    def refit(self):
+        """Fits the SVD on the whole tf-idf-weighted DTM."""
+        self.tfidf_dtm, self.tfidf_transformer = self.build_tfidf()
+        self.svd, self.lsa = self.build_tfidf_lsa()
+        self._fitted_documents = self.dtm.shape[0]
+        self._drop_document_index()
+
+    def _drop_document_index(self):
+        # The index is built again for the changed documents.
+        if hasattr(self, '_document_index'):
+            del self._document_index
+
+    def _fold_in_terms(self, n_terms):
+        # Terms with index >= n_terms are new.
+        components = np.asarray(self.svd.components_)
+        sigma = self.svd.singular_values_
+        # U Σ of all documents, using the fitted term vectors.
+        documents = np.asarray(self.tfidf_dtm[:, :n_terms] @ components.T)
+        # v = x^T U Σ^-1 = x^T (U Σ) Σ^-2
+        new_components = np.asarray(self.tfidf_dtm[:, n_terms:].T @ documents)
+        new_components = np.divide(new_components, sigma ** 2,
+                                   out = np.zeros_like(new_components), where = sigma > 0)
+        self.svd.components_ = np.hstack([components, new_components.T]).astype(self._config["dtype"])
+        self.svd.n_features_in_ = self.svd.components_.shape[1]
+        self.lsa = Normalizer(copy=False).fit_transform(np.asarray(self.tfidf_dtm @ self.svd.components_.T))
+        self._drop_document_index()
+
+
     # Methods for working with additional texts
+    #   New texts pass the same pipeline as the corpus documents:
+    #   word counts on the vocabulary, idf weights of the fitted
+    #   TfidfTransformer, projection with the fitted SVD. The analyzer
+    #   of the vectorizer and the lookup of terms are built once per space.
+
+    def analyzer(self):
+        """Returns the analyzer of the vectorizer (splits a string into terms)."""
+        if not hasattr(self, '_analyzer'):
+            self._analyzer = self.vectorizer.build_analyzer()
+        return self._analyzer
+
+    def term_index(self):
+        """Returns dictionary: term -> column of the document-term-matrix."""
+        if not hasattr(self, '_term_index'):
+            self._term_index = {term: i for i, term in enumerate(np.asarray(self.vocabulary).tolist())}
+        return self._term_index
 
     def vectorize_on_vocabulary(self, text):
         """Computes vector representation of given Text object."""
-        # Build a list with one entry containing text as string.
-        lemmatized_text = [" ".join(text.lemmatized_words())]
-        # Build vector via word counting.
-        vectorizer = CountVectorizer(min_df=1, vocabulary = self.vocabulary)
-        return vectorizer.transform(lemmatized_text)
+        return self.vectorize_many([text])
+
+    def vectorize_many(self, texts):
+        """Computes vector representations (word counts) of given Text objects.
+        Returns sparse matrix with one row per text.
+        """
+        # Tag all texts in one pass.
+        texts = tag_corpus(texts, taglevel = 1)
+        analyzer = self.analyzer()
+        term_index = self.term_index()
+        # Build vectors via word counting. Terms not in
+        # the vocabulary are ignored.
+        indptr = [0]
+        indices = []
+        for text in texts:
+            for term in analyzer(" ".join(text.lemmatized_words())):
+                column = term_index.get(term)
+                if column is not None:
+                    indices.append(column)
+            indptr.append(len(indices))
+        vectors = scipy.sparse.csr_matrix(
+            (np.ones(len(indices), dtype = np.int64), indices, indptr),
+            shape = (len(texts), len(term_index)))
+        # Sum up repeated terms.
+        vectors.sum_duplicates()
+        return vectors
 
     def tfidf_on_vocabulary(self, text):
         """Computes tfidf-weighted vector representation of given Text object."""
-        return Normalizer(copy=False).fit_transform(self.vectorize_on_vocabulary(text))
+        return self.transform_many([text])
+
+    def transform_many(self, texts):
+        """Computes tfidf-weighted and normalized vector representations
+        of given Text objects with the idf weights of the fitted
+        TfidfTransformer. Returns sparse matrix with one row per text.
+        """
+        # Same as self.tfidf_transformer.transform() (norm "l2"), without
+        # validating the input on every call.
+        counts = self.vectorize_many(texts)
+        data = (counts.data * self.tfidf_transformer.idf_[counts.indices]).astype(self._config["dtype"])
+        rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+        norms = np.sqrt(np.bincount(rows, weights = data ** 2, minlength = counts.shape[0]))
+        data /= norms[rows]
+        return scipy.sparse.csr_matrix((data, counts.indices, counts.indptr), shape = counts.shape)
 
     def project_on_semantic_space(self, text):
         """Projects vector of given Text Object on semantic space."""
-        vector = self.tfidf_on_vocabulary(text)
-        return self.svd.transform(vector)
+        return self.project_many([text])
+
+    def project_many(self, texts):
+        """Projects vectors of given Text objects on semantic space.
+        Returns dense matrix with one row per text.
+        """
+        vectors = self.transform_many(texts)
+        return np.asarray(vectors @ self.svd.components_.T)
+
+    def cosine_matrix(self, texts):
+        """Computes cosine-similarities of all pairs of given Text objects
+        in the semantic space. Every text is projected once; the cosines
+        are given by one product of the normalized projections.
+        """
+        projections = normalize(self.project_many(texts))
+        return projections @ projections.T
 
     def cosine(self, text_x, text_y):
         """Computes cosine-similarity of two given Text objects in the semantic space."""
@@ -117,38 +423,78 @@ class SemanticSpace:
         cosine = cosine_similarity(x, y)[0][0]
         return cosine
 
+    def most_similar(self, text, k = 10, exact = None):
+        """Returns the k documents of the corpus most similar to the given
+        Text object as list of tuples (index of document, cosine), most
+        similar first.
 
-    # LSA Methods
+        Keyword arguments:
+        k -- Number of documents (default 10).
+        exact -- Search all documents (True) or use the approximate
+            document_index() (False). Default: exact search for spaces with
+            at most exact_search_limit documents.
+        """
+        query = normalize(self.project_many([text]))
+        if exact is None:
+            exact = len(self.lsa) <= self._config["exact_search_limit"]
+        if exact:
+            indices, cosines = exact_search(self.lsa, query, k)
+            indices, cosines = indices[0], cosines[0]
+        else:
+            indices, cosines = self.document_index().search(query[0], k)
+        return list(zip(indices.tolist(), cosines.tolist()))
+
+    def document_index(self):
+        """Returns the approximate nearest neighbour index over the
+        documents of the space (built on first use).
+        """
+        if not hasattr(self, '_document_index'):
+            self._document_index = RandomProjectionIndex(
+                self.lsa, n_tables = self._config["index_tables"],
+                n_bits = self._config["index_bits"], random_state = self._config["random_state"])
+        return self._document_index
 
-    def build_tfidf_svd(self):
-        """Method computes SVD with TFIDF-weighted DTM. Returns fitted SVD object."""
-        svd_tfidf = TruncatedSVD(self._config["n_components"], algorithm='randomized')
-        svd_tfidf.fit(self.tfidf_dtm)
-        return svd_tfidf
+
+    # LSA Methods
 
     def build_tfidf_lsa(self):
-        """Method computes LSA with TFIDF-weighted DTM.
-        Returns normalized fitted semantic space.
+        """Method computes LSA with TFIDF-weighted DTM. One SVD is fitted;
+        it projects new texts and gives the documents of the corpus.
+        Returns fitted SVD object and normalized fitted semantic space.
         """
-        svd = TruncatedSVD(self._config["n_components"], algorithm='randomized')
-        lsa_tfidf = svd.fit_transform(self.tfidf_dtm)
+        svd_tfidf = TruncatedSVD(self._config["n_components"], algorithm='randomized',
+                                 random_state = self._config["random_state"])
+        lsa_tfidf = svd_tfidf.fit_transform(self.tfidf_dtm)
         lsa_tfidf = Normalizer(copy=False).fit_transform(lsa_tfidf)
-        return lsa_tfidf
+        svd_tfidf.components_ = svd_tfidf.components_.astype(self._config["dtype"], copy = False)
+        return svd_tfidf, lsa_tfidf.astype(self._config["dtype"], copy = False)
+
+    def project_documents(self, indices = None):
+        """Returns the normalized projections of the corpus documents
+        (all documents or the documents with the given indices).
+        """
+        if indices is None:
+            return self.lsa
+        return self.lsa[indices]
 
     def build_tfidf(self):
         """Method to build term-frequency inverse-document-frequency matrix.
-        Returns transformed DTM matrix.
+        Returns transformed DTM matrix and fitted transformer.
         """
 
         tfidf_transformer = TfidfTransformer()
-        tfidf_dtm = tfidf_transformer.fit_transform(self.dtm)
-        return tfidf_dtm
+        # The transformer keeps the dtype of float matrices.
+        tfidf_dtm = tfidf_transformer.fit_transform(self.dtm.astype(self._config["dtype"]))
+        return tfidf_dtm, tfidf_transformer
 
     def build_dtm(self):
         """Method to build the document term matrix
         Returns matrix, lexicon of terms and vectorizer object.
         """
-        lemmatized_corpus = self.get_lemmatized_plaintext_corpus()
+        # The vectorizer consumes the documents one by one and builds
+        # vocabulary and sparse matrix incrementally. The lemmatized
+        # corpus is never held in memory.
+        lemmatized_corpus = self.iter_lemmatized_plaintext_corpus()
         # Generiere Document-Term-Matrix und vocabulary
         vectorizer = CountVectorizer(min_df=1)
         dtm = vectorizer.fit_transform(lemmatized_corpus)
@@ -162,12 +508,13 @@ class SemanticSpace:
         for i in range(0, self._config["n_components"]):
             # Sammle Wörter und Gewichte aus Dimension
             sing_vecs = self.svd.components_[i]
-            index = np.argsort(sing_vecs).tolist()
-            index.reverse()
-            terms = [self.vocabulary[weightIndex] for weightIndex in index[0:10]]
-            weights = [sing_vecs[weightIndex] for weightIndex in index[0:10]]
-            terms.reverse()
-            weights.reverse()
+            # Select the 10 terms with highest weights without sorting
+            # the whole vector, in ascending order of weights.
+            n = min(10, len(sing_vecs))
+            index = np.argpartition(-sing_vecs, n - 1)[:n]
+            index = index[np.argsort(sing_vecs[index], kind = 'stable')]
+            terms = [self.vocabulary[weightIndex] for weightIndex in index]
+            weights = [sing_vecs[weightIndex] for weightIndex in index]
             # Strukturiere Wörter/Gewichte in DataFrame
             temp = pd.DataFrame(columns=('terms','weights'))
             temp['terms'] = terms
@@ -176,6 +523,35 @@ class SemanticSpace:
             result.append(temp)
         return result
 
+    def memory_usage(self):
+        """Returns dictionary with the memory (in bytes) of the data
+        structures of the space and their total. Memory-mapped arrays
+        are counted with their full size.
+        """
+        def sparse_bytes(matrix):
+            if matrix is None:
+                return 0
+            return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+        vocabulary = self.vocabulary
+        if not hasattr(vocabulary, 'nbytes'):
+            vocabulary = np.asarray(vocabulary, dtype = object)
+        usage = {
+            "dtm": sparse_bytes(self.dtm),
+            "tfidf_dtm": sparse_bytes(self.tfidf_dtm),
+            "lsa": self.lsa.nbytes,
+            "components": self.svd.components_.nbytes,
+            "idf": self.tfidf_transformer.idf_.nbytes,
+            "vocabulary": vocabulary.nbytes + (
+                sum(sys.getsizeof(term) for term in vocabulary) if getattr(vocabulary, 'dtype', None) == object else 0),
+        }
+        if hasattr(self, '_document_index'):
+            index = self._document_index
+            usage["document_index"] = index.planes.nbytes + sum(
+                order.nbytes + codes.nbytes for order, codes in zip(index._order, index._codes))
+        usage["total"] = sum(usage.values())
+        return usage
+
     def print_components(self):
         components = self.get_components()
         for i in range(0, self._config["n_components"]):
@@ -211,27 +587,56 @@ class SemanticSpace:
         """
         raise NotImplementedError()
 
+    def iter_corpus_texts(self):
+        """Generator of the corpus texts as Text objects. Defaults to
+        the texts of read_corpus_file(). Corpus classes for large corpora
+        should override this method and read their files lazily.
+        """
+        for text in self.read_corpus_file():
+            yield text
+
+    def iter_lemmatized_plaintext_corpus(self):
+        """Generator of the documents (paragraphs) of the corpus as strings
+        of lemmas. Texts are read lazily and tagged in chunks, so only a
+        few chunks of Text objects are held in memory. With n_jobs > 1 the
+        chunks are lemmatized by a pool of worker processes; documents are
+        returned in the order of the corpus.
+        """
+        n_jobs = self._config["n_jobs"]
+        if n_jobs <= 1:
+            for chunk in self._iter_corpus_chunks():
+                yield from lemmatize_documents(chunk)
+            return
+
+        # Every worker loads the tagger once. Tagger models already
+        # loaded in this process are shared with forked workers.
+        with multiprocessing.Pool(n_jobs, initializer = _init_lemmatize_worker,
+                                  initargs = ((Text._config["language"],),)) as pool:
+            # Keep a bounded number of chunks in flight and
+            # collect the results in submission order.
+            pending = deque()
+            for chunk in self._iter_corpus_chunks():
+                pending.append(pool.apply_async(lemmatize_documents, (chunk,)))
+                if len(pending) > 2 * n_jobs:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
+
+    def _iter_corpus_chunks(self):
+        chunk = list()
+        for text in self.iter_corpus_texts():
+            chunk.append(text)
+            if len(chunk) >= self._config["chunksize"]:
+                yield chunk
+                chunk = list()
+        if chunk:
+            yield chunk
+
     def get_lemmatized_plaintext_corpus(self):
-        """[TODO]
-        """
-        # corpus = self.build_bag_of_lemmalists()
-        corpus = []
-        for t in self.read_corpus_file():
-            corpus = corpus + [Text(plaintext=p).lemmatized_sentences() for p in t.paragraphs]
-        lemma_corpus = list()
-        # Iteriere über Sätze.
-        for text in corpus:
-            lemma_text = list()
-            for sentence in text:
-                # Iteriere über Tags.
-                for lemma in sentence:
-                    # Keine Satzzeichen.
-                    if lemma != "--":
-                        # Nur Kleinschreibung
-                        lemma_text.append(lemma)
-            # Füge Satz zusammen.
-            lemma_corpus.append(" ".join(lemma_text))
-        return lemma_corpus
+        """Returns the documents (paragraphs) of the corpus as list of
+        strings of lemmas. See iter_lemmatized_plaintext_corpus().
+        """
+        return list(self.iter_lemmatized_plaintext_corpus())
 
     def build_bag_of_sentences(self):
         return [t.sentences() for t in self.read_corpus_file()]
@@ -0,0 +1,194 @@
+# shared_space.py - Shares fitted semantic spaces between processes.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# A parent process publishes a fitted SemanticSpace into one block of
+# multiprocessing.shared_memory; worker processes attach to the block and
+# use its arrays without copying them:
+#
+#   shared = publish_space(space)
+#   with multiprocessing.Pool(n, initializer = init_worker, initargs = (shared.descriptor,)) as pool:
+#       …                              # init_worker calls attach_space(descriptor)
+#   shared.unlink()
+#
+# The block holds idf weights, SVD components, document vectors and the
+# vocabulary. A dict of terms would be a copy per process, so the vocabulary
+# is stored as arrays as well: the UTF-8 bytes of all terms, their offsets,
+# and an open addressing hash table (crc32, linear probing) of term indices.
+#
+# The descriptor is a small picklable dictionary (name of the block and
+# layout of the arrays). Processes should be started by multiprocessing,
+# so that they share the resource tracker of the parent and the block is
+# unlinked by the parent only.
+
+import zlib
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .semantic_space import SemanticSpace
+
+
+class SharedVocabulary(object):
+    """Array-backed vocabulary of a semantic space. Maps index to term
+    (like the vocabulary array) and term to index (like a dict).
+    """
+
+    def __init__(self, data, offsets, table):
+        """Creates the vocabulary from its arrays, see build_arrays().
+        """
+        self._data = data
+        self._offsets = offsets
+        self._table = table
+        self._mask = len(table) - 1
+
+    @staticmethod
+    def build_arrays(terms):
+        """Returns the arrays (data, offsets, table) of a vocabulary of the
+        given terms: UTF-8 bytes of all terms, offsets of the terms in the
+        bytes and hash table with the index of every term (-1 for free slots).
+        """
+        encoded = [term.encode("utf-8") for term in terms]
+        offsets = np.cumsum([0] + [len(term) for term in encoded]).astype(np.int64)
+        data = np.frombuffer(b"".join(encoded), dtype = np.uint8)
+        # Table size: power of two, at most half filled.
+        size = 1
+        while size < 2 * max(len(encoded), 1):
+            size *= 2
+        table = np.full(size, -1, dtype = np.int64)
+        for i, term in enumerate(encoded):
+            slot = zlib.crc32(term) & (size - 1)
+            while table[slot] >= 0:
+                slot = (slot + 1) & (size - 1)
+            table[slot] = i
+        return data, offsets, table
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return self._data[self._offsets[i]:self._offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def get(self, term, default = None):
+        """Returns the index of the term or default."""
+        encoded = term.encode("utf-8")
+        slot = zlib.crc32(encoded) & self._mask
+        while True:
+            i = self._table[slot]
+            if i < 0:
+                return default
+            if self._data[self._offsets[i]:self._offsets[i + 1]].tobytes() == encoded:
+                return int(i)
+            slot = (slot + 1) & self._mask
+
+    def __contains__(self, term):
+        return self.get(term) is not None
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes + self._offsets.nbytes + self._table.nbytes
+
+
+class SharedSpace(object):
+    """Handle of a semantic space published in shared memory.
+    """
+
+    def __init__(self, memory, descriptor):
+        self.memory = memory
+        self.descriptor = descriptor
+
+    def close(self):
+        """Closes the block in this process."""
+        self.memory.close()
+
+    def unlink(self):
+        """Closes and frees the block. Attached processes must not
+        use their spaces afterwards.
+        """
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.unlink()
+
+
+def publish_space(space, name = None):
+    """Copies the arrays and the vocabulary of a fitted SemanticSpace
+    into a new block of shared memory. Returns a SharedSpace, whose
+    descriptor can be passed to attach_space() in other processes.
+
+    Keyword arguments:
+    name -- Name of the shared memory block (default: generated name).
+    """
+    data, offsets, table = SharedVocabulary.build_arrays(
+        [str(term) for term in space.vocabulary])
+    arrays = {
+        "idf": space.tfidf_transformer.idf_,
+        "lsa": space.lsa,
+        "vocabulary_data": data,
+        "vocabulary_offsets": offsets,
+        "vocabulary_table": table,
+    }
+    for attribute in SemanticSpace._svd_attributes:
+        arrays["svd_%s" % attribute.rstrip("_")] = getattr(space.svd, attribute)
+
+    # Layout of the block, arrays aligned to 64 bytes.
+    layout = {}
+    size = 0
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[key] = array
+        size = (size + 63) // 64 * 64
+        layout[key] = (size, array.dtype.str, array.shape)
+        size += array.nbytes
+
+    memory = shared_memory.SharedMemory(name = name, create = True, size = max(size, 1))
+    for key, array in arrays.items():
+        offset, dtype, shape = layout[key]
+        np.ndarray(shape, dtype = dtype, buffer = memory.buf, offset = offset)[...] = array
+    descriptor = {
+        "name": memory.name,
+        "layout": layout,
+        "config": dict(space._config),
+        "fitted_documents": space._fitted_documents,
+    }
+    return SharedSpace(memory, descriptor)
+
+def attach_space(descriptor):
+    """Returns a SemanticSpace using the arrays of the shared memory block
+    of the given descriptor (see publish_space()). Nothing is copied; the
+    arrays are read-only. Projection, cosines and searches work as usual,
+    documents cannot be added.
+    """
+    memory = shared_memory.SharedMemory(name = descriptor["name"])
+    arrays = {}
+    for key, (offset, dtype, shape) in descriptor["layout"].items():
+        array = np.ndarray(shape, dtype = dtype, buffer = memory.buf, offset = offset)
+        array.flags.writeable = False
+        arrays[key] = array
+    vocabulary = SharedVocabulary(
+        arrays.pop("vocabulary_data"), arrays.pop("vocabulary_offsets"), arrays.pop("vocabulary_table"))
+    space = SemanticSpace.from_arrays(
+        descriptor["config"], vocabulary, arrays, descriptor["fitted_documents"])
+    # The vocabulary maps terms to columns itself.
+    space._term_index = vocabulary
+    # Keep the block mapped as long as the space lives.
+    space._shared_memory = memory
+    return space
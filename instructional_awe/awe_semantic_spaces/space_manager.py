@@ -0,0 +1,200 @@
+# space_manager.py - Loads and caches named semantic spaces.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# Texts are scored against several semantic spaces (e.g. per subject and
+# grade). Fitted spaces are stored with SemanticSpace.save() as directories
+# below the corpora path, the name of the directory is the name of the space:
+#   assets/corpora/biology_7/meta.json, …
+#
+# Spaces are loaded with the class recorded by save() in meta.json (a
+# subclass of SemanticSpace, e.g. a corpus class), if the module of this
+# class is imported, otherwise with SemanticSpace. A manager can also load
+# all spaces with a given class (space_class).
+#
+# The SpaceManager loads spaces by name and keeps a bounded LRU of loaded
+# spaces. Spaces are evicted (least recently used first), when there are
+# more than max_spaces spaces or their memory (SemanticSpace.memory_usage())
+# exceeds max_memory bytes. The default manager can be configured with the
+# environment variables
+#   AWE_SPACES_PATH     -- directory of the saved spaces (default: corpora path)
+#   AWE_SPACES_MEMORY   -- maximum memory of loaded spaces in bytes (default: none)
+#   AWE_PRELOAD_SPACES  -- names of spaces loaded by preload_spaces(), e.g. "biology_7,history_9"
+# Importing the module never loads spaces; workers call preload_spaces()
+# explicitly at startup.
+
+import os
+import json
+import threading
+from collections import OrderedDict
+
+from .semantic_space import SemanticSpace
+
+
+class SpaceManager(object):
+    """Loads named semantic spaces and keeps the recently used ones in memory.
+    """
+
+    def __init__(self, path = None, max_spaces = None, max_memory = None,
+                 mmap_mode = 'r', matrices = False, space_class = None):
+        """Creates a new manager.
+
+        Keyword arguments:
+        path -- Directory of the saved spaces (default: corpora path).
+        max_spaces -- Maximum number of spaces held in memory (default None, no limit).
+        max_memory -- Maximum memory of the spaces held in memory in bytes
+            (default None, no limit).
+        mmap_mode -- Memory-map mode for loading spaces (default 'r').
+        matrices -- Load document-term-matrices of the spaces (default False).
+        space_class -- Class used for loading all spaces (default None, the
+            class recorded in the meta data of each space).
+        """
+        self.path = path or SemanticSpace.get_corpora_path()
+        self.max_spaces = max_spaces
+        self.max_memory = max_memory
+        self.mmap_mode = mmap_mode
+        self.matrices = matrices
+        self.space_class = space_class
+        self._spaces = OrderedDict()
+        self._memory = {}
+        self._lock = threading.RLock()
+
+    def names(self):
+        """Returns the names of all saved spaces."""
+        return sorted(name for name in os.listdir(self.path)
+                      if os.path.isfile(os.path.join(self.path, name, "meta.json")))
+
+    def loaded(self):
+        """Returns the names of the spaces in memory, least recently used first."""
+        with self._lock:
+            return list(self._spaces)
+
+    def get(self, name):
+        """Returns the space with the given name. Loads the space, if
+        it is not in memory.
+        """
+        with self._lock:
+            if name in self._spaces:
+                self._spaces.move_to_end(name)
+                return self._spaces[name]
+        path = os.path.join(self.path, name)
+        space_class = self.space_class or self._recorded_class(path)
+        space = space_class.load(path, mmap_mode = self.mmap_mode, matrices = self.matrices)
+        return self.put(name, space)
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._spaces
+
+    def put(self, name, space):
+        """Keeps a space under the given name in memory. Returns the
+        space (or the space already kept under this name).
+        """
+        with self._lock:
+            if name in self._spaces:
+                # Another thread might have loaded the space in the meantime.
+                self._spaces.move_to_end(name)
+                return self._spaces[name]
+            self._spaces[name] = space
+            self._memory[name] = space.memory_usage()["total"]
+            self._evict()
+            return space
+
+    def save(self, name, space):
+        """Stores a fitted space under the given name and keeps it in memory."""
+        space.save(os.path.join(self.path, name))
+        with self._lock:
+            self.discard(name)
+            return self.put(name, space)
+
+    def preload(self, names):
+        """Loads the spaces with the given names, e.g. at startup of a worker."""
+        for name in names:
+            self.get(name)
+
+    def discard(self, name):
+        """Removes a space from memory."""
+        with self._lock:
+            self._spaces.pop(name, None)
+            self._memory.pop(name, None)
+
+    def clear(self):
+        """Removes all spaces from memory."""
+        with self._lock:
+            self._spaces.clear()
+            self._memory.clear()
+
+    def memory_usage(self):
+        """Returns the memory of the spaces in memory in bytes."""
+        with self._lock:
+            return sum(self._memory.values())
+
+    @staticmethod
+    def _recorded_class(path):
+        # Class recorded by save(), searched among the (imported)
+        # subclasses of SemanticSpace.
+        with open(os.path.join(path, "meta.json"), encoding = "utf-8") as meta_file:
+            name = json.load(meta_file).get("class")
+        classes = [SemanticSpace]
+        while classes:
+            space_class = classes.pop()
+            if space_class.__name__ == name:
+                return space_class
+            classes.extend(space_class.__subclasses__())
+        return SemanticSpace
+
+    def _evict(self):
+        # Evict least recently used spaces, but keep
+        # the space used last.
+        while len(self._spaces) > 1 and (
+                (self.max_spaces is not None and len(self._spaces) > self.max_spaces) or
+                (self.max_memory is not None and self.memory_usage() > self.max_memory)):
+            name, _ = self._spaces.popitem(last = False)
+            self._memory.pop(name, None)
+
+
+# Process-wide default manager.
+_default_manager = None
+
+def get_space_manager():
+    """Returns the process-wide default manager."""
+    global _default_manager
+    if _default_manager is None:
+        memory = os.environ.get("AWE_SPACES_MEMORY")
+        _default_manager = SpaceManager(
+            path = os.environ.get("AWE_SPACES_PATH") or None,
+            max_memory = int(memory) if memory else None)
+    return _default_manager
+
+def set_space_manager(manager):
+    """Replaces the process-wide default manager."""
+    global _default_manager
+    _default_manager = manager
+
+def get_space(name):
+    """Returns the space with the given name from the default manager."""
+    return get_space_manager().get(name)
+
+def preload_spaces(names = None):
+    """Loads spaces into the default manager, e.g. at startup of a worker.
+
+    Keyword arguments:
+    names -- Names of the spaces (default: names of the environment
+        variable AWE_PRELOAD_SPACES).
+    """
+    if names is None:
+        names = [name.strip() for name in os.environ.get("AWE_PRELOAD_SPACES", "").split(",") if name.strip()]
+    get_space_manager().preload(names)
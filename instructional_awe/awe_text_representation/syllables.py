@@ -0,0 +1,65 @@
+# syllables.py - Process-wide pyphen hyphenators and memoized syllable counts.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# Syllables are counted with the hyphenation rules of pyphen: number of
+# positions for hyphenization plus 1. Loading a Pyphen dictionary parses
+# the hyphenation patterns of the language, and hyphenating a word walks
+# through these patterns. Here every dictionary is loaded once per process
+# and the syllable counts of words are kept in a bounded LRU cache, shared
+# by all texts. So scoring a batch of texts hyphenates every distinct word
+# once.
+#
+# The size of the cache can be configured with the environment variable
+#   AWE_SYLLABLE_CACHE_SIZE  -- maximum number of cached words (default: 100000)
+
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pyphen
+
+# Loaded hyphenators, keyed by language (e.g. "de_DE").
+_hyphenators = {}
+_lock = threading.Lock()
+
+
+def get_hyphenator(lang = "de_DE"):
+    """Returns the shared pyphen.Pyphen dictionary for the given language."""
+    hyphenator = _hyphenators.get(lang)
+    if hyphenator is None:
+        with _lock:
+            # Another thread might have loaded the dictionary in the meantime.
+            hyphenator = _hyphenators.get(lang)
+            if hyphenator is None:
+                hyphenator = pyphen.Pyphen(lang = lang)
+                _hyphenators[lang] = hyphenator
+    return hyphenator
+
+@lru_cache(maxsize = int(os.environ.get("AWE_SYLLABLE_CACHE_SIZE", 100000)))
+def syllable_count(word, lang = "de_DE"):
+    """Returns the number of syllables of a word."""
+    return len(get_hyphenator(lang).positions(word)) + 1
+
+def syllable_counts(words, lang = "de_DE"):
+    """Returns array with the number of syllables of the given words."""
+    return np.array([syllable_count(word, lang) for word in words], dtype = np.int32)
+
+def cache_info():
+    """Returns hits, misses and size of the syllable cache."""
+    return syllable_count.cache_info()
+
+def clear_syllable_cache():
+    """Drops all cached syllable counts."""
+    syllable_count.cache_clear()
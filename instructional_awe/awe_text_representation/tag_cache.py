@@ -0,0 +1,184 @@
+# tag_cache.py - Cache for HanoverTagger analyses of single tokens.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# HanoverTagger.tag_sent() works in two steps: the PoS-tags of a sentence
+# are computed with the viterbi algorithm (this depends on the context of
+# the token), then every token is analyzed with its PoS-tag (lemma, stem,
+# morphemes). The second step only depends on the lower case token,
+# its PoS-tag and the taglevel. So analyses are cached with the key
+#   (language, token, PoS-tag, taglevel)
+# in a bounded in-memory LRU cache. Optionally, the analyses are stored
+# in a SQLite database, which can be shared by several worker processes.
+# New analyses are written in batches: after flush_every analyses or
+# flush_interval seconds, at the end of tag_corpus() and at exit. Workers of
+# a multiprocessing.Pool exit without running atexit handlers, so they
+# have to flush explicitly (see semantic_space.py).
+#
+# The default cache can be configured with the environment variables
+#   AWE_TAG_CACHE       -- path of the SQLite database (default: none)
+#   AWE_TAG_CACHE_SIZE  -- maximum number of in-memory entries (default: 100000)
+
+import os
+import json
+import sqlite3
+import time
+import atexit
+import threading
+from collections import OrderedDict
+
+
+class TagCache(object):
+    """Bounded LRU cache for token analyses with an optional
+    SQLite store.
+    """
+
+    def __init__(self, maxsize = 100000, path = None, flush_every = 1000, flush_interval = 5.0):
+        """Creates a new cache.
+
+        Keyword arguments:
+        maxsize -- Maximum number of entries held in memory (default 100000).
+        path -- Path of a SQLite database to store analyses on disk (default None).
+        flush_every -- Number of new analyses written to disk at once (default 1000).
+        flush_interval -- Maximum time in seconds new analyses are held
+            back before writing them to disk (default 5).
+        """
+        self.maxsize = maxsize
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries = OrderedDict()
+        self._pending = []
+        self._lock = threading.RLock()
+        self._connection = None
+        self._pid = None
+        if path:
+            atexit.register(self.flush)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the cached analysis for key or None."""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                value = self._load(key)
+                if value is None:
+                    self.misses += 1
+                    return None
+                self.disk_hits += 1
+                self._remember(key, value)
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Stores the analysis for key. Analyses have to be
+        JSON serializable.
+        """
+        with self._lock:
+            self._remember(key, value)
+            if self.path:
+                self._pending.append((key, value))
+                if (len(self._pending) >= self.flush_every or
+                        time.monotonic() - self._last_flush >= self.flush_interval):
+                    self.flush()
+
+    def stats(self):
+        """Returns a dictionary with hit and miss counters. Every lookup
+        counts once: as hit (found in memory), disk hit (found in the
+        database) or miss. The hit rate includes disk hits.
+        """
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+    def clear(self):
+        """Empties the in-memory cache and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = 0
+
+    def flush(self):
+        """Writes pending analyses to the SQLite database."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?)",
+                    [(*key, json.dumps(value)) for key, value in self._pending])
+            self._pending = []
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last = False)
+
+    def _load(self, key):
+        if not self.path:
+            return None
+        row = self._connect().execute(
+            "SELECT analysis FROM analyses WHERE language = ? AND token = ? AND pos = ? AND taglevel = ?",
+            key).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def _connect(self):
+        # SQLite connections must not be shared with forked
+        # child processes. Reconnect in every process.
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout = 30, check_same_thread = False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "language TEXT, token TEXT, pos TEXT, taglevel INTEGER, analysis TEXT, "
+                "PRIMARY KEY (language, token, pos, taglevel))")
+            self._pid = os.getpid()
+        return self._connection
+
+
+_default_cache = None
+
+def get_tag_cache():
+    """Returns the process-wide default cache."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TagCache(
+            maxsize = int(os.environ.get("AWE_TAG_CACHE_SIZE", 100000)),
+            path = os.environ.get("AWE_TAG_CACHE") or None)
+    return _default_cache
+
+def set_tag_cache(cache):
+    """Replaces the process-wide default cache, e.g. with a cache
+    using a SQLite store: set_tag_cache(TagCache(path = "tags.db"))
+    """
+    global _default_cache
+    _default_cache = cache
@@ -0,0 +1,134 @@
+# tagger.py - Process-wide registry for HanoverTagger models.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# Loading a HanoverTagger unpickles the gzipped morph model, which takes
+# about a second for the german model. Text objects (and the throwaway
+# Text objects created for sentences and paragraphs) used to load their own
+# model. Here every model is loaded once per process and shared.
+#
+# Models can be preloaded before worker processes are forked, so that
+# children share the pages of the parent (copy-on-write):
+#   preload_taggers()
+# Called without languages, preload_taggers() loads the languages of the
+# environment variable
+#   AWE_PRELOAD_TAGGERS=german[,english,…]
+# Importing the package never loads models.
+
+import os
+import threading
+
+# Use HanoverTagger for POS-Tagging.
+# See: https://github.com/wartaal/HanTa
+from HanTa import HanoverTagger as ht
+
+# Cache for the analyses of single tokens.
+from .tag_cache import get_tag_cache
+
+# Morph models shipped with HanTa, per language.
+models = {
+    "german": "morphmodel_ger.pgz",
+    "english": "morphmodel_en.pgz",
+    "dutch": "morphmodel_dutch.pgz",
+}
+
+# Loaded taggers, keyed by model path.
+_taggers = {}
+_lock = threading.Lock()
+
+
+def get_tagger(language = "german", model = None):
+    """Returns the shared HanoverTagger for the given language.
+
+    Keyword arguments:
+    language -- Language of the morph model (default "german").
+    model -- Path to a morph model. Overrides language (default None).
+    """
+    if model is None:
+        try:
+            model = models[language]
+        except KeyError:
+            raise ValueError("No tagger model for language '%s'." % language)
+    tagger = _taggers.get(model)
+    if tagger is None:
+        with _lock:
+            # Another thread might have loaded the model in the meantime.
+            tagger = _taggers.get(model)
+            if tagger is None:
+                tagger = ht.HanoverTagger(model)
+                _taggers[model] = tagger
+    return tagger
+
+def preload_taggers(languages = None):
+    """Loads the taggers for the given languages, e.g. before forking
+    worker processes.
+
+    Keyword arguments:
+    languages -- Languages of the taggers (default: languages of the
+        environment variable AWE_PRELOAD_TAGGERS, else "german").
+    """
+    if languages is None:
+        languages = [l.strip() for l in os.environ.get("AWE_PRELOAD_TAGGERS", "german").split(",") if l.strip()]
+    for language in languages:
+        get_tagger(language)
+
+def tag_sentence(sentence, taglevel = 1, language = "german", cache = None):
+    """Tags a tokenized sentence like HanoverTagger.tag_sent(), but looks up
+    the analyses of the single tokens in the tag cache first.
+
+    Keyword arguments:
+    taglevel -- HanoverTagger taglevel (default 1).
+    language -- Language of the morph model (default "german").
+    cache -- TagCache to use (default: the process-wide cache).
+    """
+    tags = pos_tag_sentence(sentence, language)
+    if taglevel == 0:
+        return tags
+    return analyze_sentence(sentence, tags, taglevel, language, cache)
+
+def pos_tag_sentence(sentence, language = "german"):
+    """Returns the PoS-tags of a tokenized sentence (HanoverTagger taglevel 0).
+    PoS-tags depend on the context of the token and are not cached.
+    """
+    return get_tagger(language).tag_sent(sentence, taglevel = 0)
+
+def analyze_sentence(sentence, tags, taglevel = 1, language = "german", cache = None):
+    """Analyzes the tokens of a sentence with their given PoS-tags.
+    Returns the same list as HanoverTagger.tag_sent() for taglevels 1 to 3.
+    """
+    if cache is None:
+        cache = get_tag_cache()
+    tagger = get_tagger(language)
+    tagged_sentence = []
+    for token, tag in zip(sentence, tags):
+        # HanoverTagger analyzes lower case tokens.
+        key = (language, token.lower(), tag, taglevel)
+        analysis = cache.get(key)
+        if analysis is None:
+            if taglevel in (1, 2):
+                analysis = tagger.analyze(token, tag, taglevel = taglevel)[0]
+            else:
+                stem, morphemes, _ = tagger.analyze(token, tag, taglevel = 3)
+                analysis = [stem, morphemes]
+            cache.put(key, analysis)
+        if taglevel in (1, 2):
+            tagged_sentence.append((token, analysis, tag))
+        else:
+            tagged_sentence.append((token, analysis[0], [tuple(m) for m in analysis[1]], tag))
+    return tagged_sentence
+
+def clear_taggers():
+    """Drops all loaded taggers."""
+    with _lock:
+        _taggers.clear()
+
@@ -30,7 +30,12 @@ import nltk
 # https://textmining.wp.hs-hannover.de/Preprocessing.html
 # https://github.com/wartaal/HanTa
 # https://github.com/wartaal/HanTa/blob/master/Demo.ipynb
-from HanTa import HanoverTagger as ht
+# The models are loaded once per process and shared by all Text objects.
+from .tagger import get_tagger, pos_tag_sentence, analyze_sentence
+from .tag_cache import get_tag_cache
+
+# Columnar representation of tagged tokens.
+from .token_table import TokenTable
 
 
 class Text(object):
@@ -69,7 +74,6 @@ class Text(object):
         # Set to True, if self.paragraphs will be static.
         # Set to False, if self.paragraphs might change.
         self.cache_representations = True
-        self.cache_taglevel = 1
 
         if plaintext:
             # plaintext argument was given.
@@ -152,18 +156,34 @@ class Text(object):
 
         return self._sentences_in_paragraphs
 
+    def pos_tagged_sentences(self):
+        """Return a list of lists of strings, each one being the PoS-tags
+        of the words of a sentence. All taglevels share this tagging pass.
+        """
+        if (not hasattr(self, '_pos_sentences')) or (not self.cache_representations):
+            language = self._config['language']
+            self._pos_sentences = [pos_tag_sentence(sentence, language) for sentence in self.words]
+
+        return self._pos_sentences
+
     def tagged_sentences(self, taglevel = 1):
         """Return a list of lists of triples (string, string, string), 
         representing the sentences with lemmaticed and tagged words.
+        Tagged sentences are cached for every taglevel.
         """
-        if (not hasattr(self, '_tagged_sentences')) or (not self.cache_representations) or (taglevel != self.cache_taglevel):
-            # Create list of sentences.
-            self._tagged_sentences = list()
-            for sentence in self.words:
-                # Create lists of triples (word, lemma, tag) from sentence.
-                self._tagged_sentences.append(self.tagger().tag_sent(sentence, taglevel))
-        self.cache_taglevel = taglevel
-        return self._tagged_sentences
+        if (not hasattr(self, '_tagged_sentences')) or (not self.cache_representations):
+            self._tagged_sentences = dict()
+        if taglevel not in self._tagged_sentences:
+            if taglevel == 0:
+                self._tagged_sentences[0] = self.pos_tagged_sentences()
+            else:
+                # Create lists of triples (word, lemma, tag) from sentence
+                # and its PoS-tags.
+                language = self._config['language']
+                self._tagged_sentences[taglevel] = [
+                    analyze_sentence(sentence, tags, taglevel, language)
+                    for sentence, tags in zip(self.words, self.pos_tagged_sentences())]
+        return self._tagged_sentences[taglevel]
 
     def tagged_words(self, taglevel = 1):
         """Return a list of triples (string, string, sting), representing the tokens
@@ -197,7 +217,7 @@ class Text(object):
         """Return a list of strings, each one being a sentence of the text
         containing only stemmed words.
         """
-        if (not hasattr(self, '_lemmatized_sentences')) or (not self.cache_representations):
+        if (not hasattr(self, '_stemmed_sentences')) or (not self.cache_representations):
             self._stemmed_sentences = list()
             for sentence in self.tagged_sentences(taglevel = 2):
                 s_sentence = [t[1] for t in sentence]
@@ -209,12 +229,51 @@ class Text(object):
         """Return a list of strings, representing the stemmed words
         not separated in sentences.
         """
-        if (not hasattr(self, '_lemmatized_words')) or (not self.cache_representations):
+        if (not hasattr(self, '_stemmed_words')) or (not self.cache_representations):
             self._stemmed_words = list(
-                chain.from_iterable(self.stemmed_sentences))
+                chain.from_iterable(self.stemmed_sentences()))
 
         return self._stemmed_words
 
+    # ===
+    # Views of sentences and paragraphs sharing the representations of this text.
+
+    def sentence_view(self, i):
+        """Return a TextView of the i-th sentence of the text. The view
+        shares words, tags and lemmas of this text.
+        """
+        i = range(len(self.sentences))[i]
+        return TextView(self, i, i + 1, [self.sentences[i]])
+
+    def paragraph_view(self, j):
+        """Return a TextView of the j-th paragraph of the text. The view
+        shares words, tags and lemmas of this text.
+        """
+        j = range(len(self.paragraphs))[j]
+        if (not hasattr(self, '_paragraph_offsets')) or (not self.cache_representations):
+            # Index of the first sentence of every paragraph.
+            self._paragraph_offsets = [0]
+            for sentences in self.sentences_in_paragraphs():
+                self._paragraph_offsets.append(self._paragraph_offsets[-1] + len(sentences))
+        start, stop = self._paragraph_offsets[j], self._paragraph_offsets[j + 1]
+        return TextView(self, start, stop, [self.paragraphs[j]])
+
+    def token_table(self):
+        """Return a TokenTable, the columnar (NumPy) representation of
+        the tagged tokens with ids for tokens, lemmas, stems and PoS-tags,
+        sentence and paragraph offsets, character lengths and syllable counts.
+        """
+        if (not hasattr(self, '_token_table')) or (not self.cache_representations):
+            self._token_table = TokenTable(self)
+
+        return self._token_table
+
+    def syllable_counts(self):
+        """Return the number of syllables of every tagged token (NumPy
+        array, same order as the token table). Computed once per text.
+        """
+        return self.token_table().syllable_counts
+
     def tagger(self):
         # Lade Tagger für Lemmatisierung und Worterkennung.
         # Liefert methoden:
@@ -223,10 +282,116 @@ class Text(object):
         #   tag_sent(tokenized_sent, casesensitive, taglevel)
         # If the taglevel is set to 1 the Hanover Tagger tries to generate the correct lemma.
         # For the levels 2 and 3 the stem of te word is given.
-        if (not hasattr(self, '_tagger')):
-            if self._config['language'] == 'german':
-                self._tagger = ht.HanoverTagger('morphmodel_ger.pgz')
-        return self._tagger
+        # The tagger is shared by all Text objects of the same language.
+        return get_tagger(self._config['language'])
 
     def language(self):
         return self._config['language'], self._config['language_short']
+
+
+class TextView(Text):
+    """Represents a sentence or paragraph of a parent Text object.
+    Words, tags and lemmas are slices of the representations of the
+    parent; the view neither tokenizes nor tags its text again.
+    """
+
+    def __init__(self, parent, start, stop, paragraphs):
+        """Creates a view of the sentences start to stop (exclusive)
+        of the parent Text object.
+
+        Keyword arguments:
+        parent -- The Text object, which owns the representations.
+        start -- Index of the first sentence of the view.
+        stop -- Index after the last sentence of the view.
+        paragraphs -- The text of the view as list of paragraphs.
+        """
+        self.title = parent.title
+        self.author = parent.author
+        self.source = parent.source
+        self.cache_representations = parent.cache_representations
+
+        self.parent = parent
+        self._start = start
+        self._stop = stop
+        self._paragraphs = paragraphs
+
+    def __str__(self):
+        return '<TextView: "%s...">' % (self.plaintext[:70])
+
+    @property
+    def sentences(self):
+        return self.parent.sentences[self._start:self._stop]
+
+    @property
+    def words(self):
+        return self.parent.words[self._start:self._stop]
+
+    def sentences_in_paragraphs(self):
+        # A view is a single paragraph.
+        return [self.sentences]
+
+    def pos_tagged_sentences(self):
+        return self.parent.pos_tagged_sentences()[self._start:self._stop]
+
+    def tagged_sentences(self, taglevel = 1):
+        return self.parent.tagged_sentences(taglevel)[self._start:self._stop]
+
+
+def tag_corpus(texts, taglevel = 1):
+    """Tags the sentences of many Text objects in one pass and fills the
+    tagging caches of the Text objects. Returns the list of texts.
+
+    Sentences occuring in several texts (or several times in one text)
+    are tagged only once. Texts, that are already tagged with the given
+    taglevel, are skipped. For TextView objects the parent is tagged.
+
+    Keyword arguments:
+    taglevel -- HanoverTagger taglevel, see Text.tagged_sentences() (default 1).
+    """
+    texts = list(texts)
+    # Views share the tagging of their parents.
+    owners = {}
+    for text in texts:
+        while isinstance(text, TextView):
+            text = text.parent
+        owners[id(text)] = text
+    pending = [text for text in owners.values() if not (
+        text.cache_representations and taglevel in getattr(text, '_tagged_sentences', {}))]
+    # Collect distinct sentences per language. A sentence is
+    # identified by its tuple of tokens. Reuse PoS-tags of texts
+    # already tagged with another taglevel.
+    untagged = {}
+    for text in pending:
+        language = text.language()[0]
+        sentences = untagged.setdefault(language, {})
+        known_tags = getattr(text, '_pos_sentences', None) if text.cache_representations else None
+        for i, sentence in enumerate(text.words):
+            if sentences.get(tuple(sentence)) is None:
+                sentences[tuple(sentence)] = known_tags[i] if known_tags else None
+
+    # Tag every distinct sentence once: PoS-tags and analyses
+    # for the requested taglevel.
+    for language, sentences in untagged.items():
+        for sentence, tags in sentences.items():
+            if tags is None:
+                tags = pos_tag_sentence(list(sentence), language)
+            if taglevel == 0:
+                sentences[sentence] = (tags, tags)
+            else:
+                sentences[sentence] = (tags, analyze_sentence(list(sentence), tags, taglevel, language))
+
+    # Fill caches of the texts.
+    for text in pending:
+        sentences = untagged[text.language()[0]]
+        tagged = [sentences[tuple(sentence)] for sentence in text.words]
+        if (not hasattr(text, '_pos_sentences')) or (not text.cache_representations):
+            text._pos_sentences = [list(tags) for tags, _ in tagged]
+        if (not hasattr(text, '_tagged_sentences')) or (not text.cache_representations):
+            text._tagged_sentences = dict()
+        if taglevel == 0:
+            text._tagged_sentences[0] = text._pos_sentences
+        else:
+            text._tagged_sentences[taglevel] = [list(sentence) for _, sentence in tagged]
+    # Persist new analyses, so that other processes and later runs can use them.
+    get_tag_cache().flush()
+    return texts
@@ -0,0 +1,153 @@
+# token_table.py - Columnar representation of the tokens of a text.
+#
+# Copyright (C) 2021 Fabian Grünig <gruenig@posteo.de>
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Development notes:
+# ==================
+# The metrics mostly count tokens with certain PoS-tags or compute
+# statistics of word lengths. Instead of filtering lists of tag triples
+# for every metric, the TokenTable stores one NumPy array per column:
+# tokens, lemmas, stems and PoS-tags as integer ids into a vocabulary
+# of distinct strings, character lengths and syllable counts.
+# Sentences and paragraphs are given as offset arrays:
+#   tokens of sentence i      -- sentence_offsets[i]:sentence_offsets[i+1]
+#   sentences of paragraph j  -- paragraph_offsets[j]:paragraph_offsets[j+1]
+
+from itertools import chain
+
+import numpy as np
+
+from .syllables import syllable_counts
+
+
+# PoS-Tags for punctuation or unknown parts of speech.
+not_word_tags = ["XY", "$.", "$,", "$("]
+
+
+def _intern(strings):
+    """Returns the sorted array of distinct strings and the
+    integer id of every string in this array.
+    """
+    vocabulary, ids = np.unique(np.array(strings, dtype = str), return_inverse = True)
+    return vocabulary, ids.astype(np.int32)
+
+
+class TokenTable(object):
+    """Columnar representation of the tagged tokens of a Text object.
+    """
+
+    def __init__(self, text):
+        """Builds the table from the tagged sentences (taglevel 1)
+        of the given Text object.
+        """
+        self._text = text
+        tagged_sentences = text.tagged_sentences(taglevel = 1)
+        tagged_words = list(chain.from_iterable(tagged_sentences))
+
+        self.tokens, self.token_ids = _intern([tag[0] for tag in tagged_words])
+        self.lemmas, self.lemma_ids = _intern([tag[1] for tag in tagged_words])
+        self.pos, self.pos_ids = _intern([tag[2] for tag in tagged_words])
+        self._pos_index = {tag: i for i, tag in enumerate(self.pos.tolist())}
+
+        self.sentence_offsets = np.cumsum(
+            [0] + [len(sentence) for sentence in tagged_sentences]).astype(np.int64)
+        self.paragraph_offsets = np.cumsum(
+            [0] + [len(paragraph) for paragraph in text.sentences_in_paragraphs()]).astype(np.int64)
+        # Index of the sentence of every token.
+        self.sentence_index = np.repeat(
+            np.arange(len(tagged_sentences)), np.diff(self.sentence_offsets)).astype(np.int32)
+
+        self.character_lengths = np.array(
+            [len(token) for token in self.tokens.tolist()], dtype = np.int32)[self.token_ids]
+
+    def __len__(self):
+        return len(self.token_ids)
+
+    @property
+    def number_of_sentences(self):
+        return len(self.sentence_offsets) - 1
+
+    @property
+    def number_of_paragraphs(self):
+        return len(self.paragraph_offsets) - 1
+
+    @property
+    def stems(self):
+        """Array of distinct stems (taglevel 2)."""
+        if not hasattr(self, '_stems'):
+            self._stems, self._stem_ids = _intern(
+                [tag[1] for tag in self._text.tagged_words(taglevel = 2)])
+        return self._stems
+
+    @property
+    def stem_ids(self):
+        """Stem id of every token (taglevel 2)."""
+        self.stems
+        return self._stem_ids
+
+    @property
+    def syllable_counts(self):
+        """Number of syllables of every token. Syllables are identified
+        by hyphenation rules using the pyphens included dictionary
+        (see syllables.py).
+        """
+        if not hasattr(self, '_syllable_counts'):
+            _, lang = self._text.language()
+            # Counts of the distinct tokens, from the process-wide cache.
+            counts = syllable_counts(self.tokens.tolist(), lang)
+            self._syllable_counts = counts[self.token_ids]
+        return self._syllable_counts
+
+    # ===
+    # Selection of tokens.
+
+    def pos_mask(self, taglist):
+        """Returns boolean array, True for tokens with a PoS-tag in taglist."""
+        ids = [self._pos_index[tag] for tag in taglist if tag in self._pos_index]
+        return np.isin(self.pos_ids, ids)
+
+    def token_mask(self, strings):
+        """Returns boolean array, True for tokens in the given strings."""
+        return np.isin(self.tokens, list(strings))[self.token_ids]
+
+    def lemma_mask(self, strings):
+        """Returns boolean array, True for tokens with a lemma in the given strings."""
+        return np.isin(self.lemmas, list(strings))[self.lemma_ids]
+
+    def word_mask(self):
+        """Returns boolean array, True for tokens, which are not
+        punctuation or unknown parts of speech.
+        """
+        if not hasattr(self, '_word_mask'):
+            self._word_mask = ~self.pos_mask(not_word_tags)
+        return self._word_mask
+
+    def count(self, taglist):
+        """Returns the number of tokens with a PoS-tag in taglist."""
+        return int(np.count_nonzero(self.pos_mask(taglist)))
+
+    def count_per_sentence(self, mask):
+        """Returns the number of selected tokens in every sentence."""
+        return np.bincount(self.sentence_index[mask], minlength = self.number_of_sentences)
+
+    def sentences_per_paragraph(self):
+        """Returns the number of sentences in every paragraph."""
+        return np.diff(self.paragraph_offsets)
+
+    def column(self, name, mask = None):
+        """Returns the strings of a column ("tokens", "lemmas", "stems" or "pos")
+        for all tokens or the selected tokens.
+        """
+        vocabulary = getattr(self, name)
+        ids = getattr(self, name[:-1] + "_ids") if name != "pos" else self.pos_ids
+        if mask is not None:
+            ids = ids[mask]
+        return vocabulary[ids].tolist()
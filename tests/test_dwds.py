@@ -0,0 +1,88 @@
+import json
+import time
+import threading
+import urllib.error
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from instructional_awe.awe_foreign.dwds import DWDS, FrequencyCache
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # Answers like the DWDS frequency API. "unavailable" fails once
+    # with 503, "slow" answers the first request too late, "unknown"
+    # always fails with 404.
+
+    def do_GET(self):
+        word = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)["q"][0]
+        self.server.calls[word] += 1
+        if word == "slow" and self.server.calls[word] == 1:
+            time.sleep(0.5)
+        if word == "unknown" or (word == "unavailable" and self.server.calls[word] == 1):
+            self.send_error(404 if word == "unknown" else 503)
+            return
+        body = json.dumps({"hits": len(word), "q": word, "total": 1000, "frequency": 3}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.calls = Counter()
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server, cache = None, timeout = 5):
+    url = "http://127.0.0.1:%d/api/frequency/" % server.server_address[1]
+    return DWDS(base_url = url, cache = cache, rate_limit = None, backoff = 0.01, timeout = timeout)
+
+
+def test_duplicate_words_are_requested_once(server):
+    client = _client(server)
+    entries = client.get_frequencies(["Haus", "Baum", "Haus", "Haus"])
+    assert entries["Haus"] == {"hits": 4, "total": 1000, "frequency": 3.0}
+    assert server.calls == Counter({"Haus": 1, "Baum": 1})
+    assert client.requests == 2
+
+
+def test_sqlite_cache_is_shared_between_instances(server, tmp_path):
+    path = str(tmp_path / "dwds.db")
+    _client(server, FrequencyCache(path)).get_frequencies(["Haus"])
+    client = _client(server, FrequencyCache(path))
+    assert client.get_frequencies(["Haus"])["Haus"]["hits"] == 4
+    assert client.requests == 0
+    assert server.calls["Haus"] == 1
+
+
+def test_unavailable_is_retried(server):
+    client = _client(server)
+    assert client.get_frequency("unavailable")["hits"] == len("unavailable")
+    assert server.calls["unavailable"] == 2
+    assert (client.requests, client.attempts) == (1, 2)
+
+
+def test_timeout_is_retried(server):
+    client = _client(server, timeout = 0.2)
+    assert client.get_frequency("slow")["hits"] == len("slow")
+    assert (client.requests, client.attempts) == (1, 2)
+
+
+def test_not_found_raises(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _client(server).get_frequencies(["unknown"])
+    assert error.value.code == 404
+    assert server.calls["unknown"] == 1
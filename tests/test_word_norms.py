@@ -0,0 +1,33 @@
+import math
+
+import nltk
+import pytest
+
+from instructional_awe.awe_lexica.word_norms import WordNormStore
+from instructional_awe.awe_metric.report import MetricReport
+from instructional_awe.awe_text_representation.text import Text
+
+try:
+    nltk.sent_tokenize("Ein Satz. Noch ein Satz.", language = "german")
+except LookupError:
+    pytest.skip("NLTK punkt tokenizer data is not installed", allow_module_level = True)
+
+
+NORM_METRICS = ["age_acquisition_content_words", "familiarity_content_words",
+                "concreteness_content_words", "imagability_content_words",
+                "meaningfulness_colorodo_content_words", "polysemy_content_words"]
+
+
+def test_default_report_with_concreteness_only_store(tmp_path):
+    store = WordNormStore.build(str(tmp_path / "norms"), {
+        "concreteness": {"Kind": 4.0, "Garten": 5.0, "spielen": 2.0},
+    })
+    text = Text(plaintext = "Die Kinder spielten im Garten. Der Garten war groß.\n"
+                            "Am Abend kamen die Eltern. Die Kinder schliefen.")
+    values = MetricReport(text, word_norms = store).compute()
+
+    assert set(NORM_METRICS) <= set(values)
+    assert values["concreteness_content_words"] > 0
+    for name in NORM_METRICS:
+        if name != "concreteness_content_words":
+            assert math.isnan(values[name])